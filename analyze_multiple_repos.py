@@ -3,15 +3,22 @@ Analyze sentiment for multiple GitHub repositories
 Supports batch analysis and comparison
 """
 import argparse
+import asyncio
 import sys
-from commit_analyzer import CommitFetcher
-from sentiment_analyzer import SentimentAnalyzer
+import requests
+from commit_analyzer import CommitFetcher, SeenCommits, get_shared_session, DEFAULT_POOL_SIZE
+from async_fetcher import AsyncCommitFetcher, DEFAULT_HOST_CONCURRENCY
+from org_crawler import OrgCrawler, DEFAULT_CRAWL_WORKERS, PRIORITIES
+from rate_limit import get_shared_scheduler
+from sentiment_analyzer import get_shared_analyzer
 from visualizer import SentimentVisualizer
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 
-def analyze_repository(owner: str, repo: str, limit: int = 200) -> Dict:
+def analyze_repository(owner: str, repo: str, limit: int = 200,
+                       session: Optional[requests.Session] = None,
+                       seen: Optional[SeenCommits] = None) -> Dict:
     """
     Analyze a single repository and return summary.
     
@@ -19,6 +26,8 @@ def analyze_repository(owner: str, repo: str, limit: int = 200) -> Dict:
         owner: Repository owner
         repo: Repository name
         limit: Number of commits to analyze
+        session: HTTP session shared across repositories (defaults to the pooled session)
+        seen: Optional seen-set of commits already analyzed in other repositories
         
     Returns:
         Dictionary with analysis results
@@ -29,46 +38,109 @@ def analyze_repository(owner: str, repo: str, limit: int = 200) -> Dict:
     
     try:
         # Fetch commits
-        fetcher = CommitFetcher(owner, repo)
+        fetcher = CommitFetcher(owner, repo, session=session, seen=seen)
         commits = fetcher.fetch_commits(limit=limit)
         
-        if not commits:
-            print(f"⚠️  No commits found for {owner}/{repo}")
-            return None
+        return summarize_repository(owner, repo, commits)
         
-        # Analyze sentiment
-        analyzer = SentimentAnalyzer()
-        df = analyzer.analyze_commits(commits)
-        summary = analyzer.get_summary(df)
+    except Exception as e:
+        print(f"✗ Error analyzing {owner}/{repo}: {e}")
+        return None
+
+
+def summarize_repository(owner: str, repo: str, commits: List[Dict]) -> Optional[Dict]:
+    """
+    Analyze already-fetched commits for a repository and return summary.
+    
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        commits: Commits fetched for the repository
         
-        # Add repository info
-        result = {
-            'repository': f"{owner}/{repo}",
-            'total_commits': summary['total_commits'],
-            'positive_count': summary['positive_count'],
-            'neutral_count': summary['neutral_count'],
-            'negative_count': summary['negative_count'],
-            'positive_percentage': summary['positive_percentage'],
-            'neutral_percentage': summary['neutral_percentage'],
-            'negative_percentage': summary['negative_percentage'],
-            'average_compound': summary['average_compound'],
-            'pn_ratio': summary['positive_count'] / summary['negative_count'] if summary['negative_count'] > 0 else 0,
-            'std_dev': df['compound'].std(),
-            'min_score': df['compound'].min(),
-            'max_score': df['compound'].max(),
-        }
+    Returns:
+        Dictionary with analysis results, or None if there were no commits
+    """
+    if not commits:
+        print(f"⚠️  No commits found for {owner}/{repo}")
+        return None
+    
+    # Analyze sentiment with the process-wide analyzer instead of one per repository
+    analyzer = get_shared_analyzer()
+    df = analyzer.analyze_commits(commits)
+    summary = analyzer.get_summary(df)
+    
+    # Add repository info
+    result = {
+        'repository': f"{owner}/{repo}",
+        'total_commits': summary['total_commits'],
+        'positive_count': summary['positive_count'],
+        'neutral_count': summary['neutral_count'],
+        'negative_count': summary['negative_count'],
+        'positive_percentage': summary['positive_percentage'],
+        'neutral_percentage': summary['neutral_percentage'],
+        'negative_percentage': summary['negative_percentage'],
+        'average_compound': summary['average_compound'],
+        'pn_ratio': summary['positive_count'] / summary['negative_count'] if summary['negative_count'] > 0 else 0,
+        'std_dev': df['compound'].std(),
+        'min_score': df['compound'].min(),
+        'max_score': df['compound'].max(),
+    }
+    
+    print(f"✓ Analyzed {len(commits)} commits")
+    print(f"  Positive: {result['positive_count']} ({result['positive_percentage']:.1f}%)")
+    print(f"  Neutral:  {result['neutral_count']} ({result['neutral_percentage']:.1f}%)")
+    print(f"  Negative: {result['negative_count']} ({result['negative_percentage']:.1f}%)")
+    print(f"  Average: {result['average_compound']:.3f}")
+    
+    return result
+
+
+async def analyze_repositories_async(repos: List[Tuple[str, str]], limit: int = 200,
+                                     session: Optional[requests.Session] = None,
+                                     host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+                                     seen: Optional[SeenCommits] = None) -> List[Dict]:
+    """
+    Fetch all repositories concurrently on one event loop, then analyze each.
+    
+    Args:
+        repos: List of (owner, repo) tuples
+        limit: Number of commits to analyze per repository
+        session: HTTP session shared across repositories (defaults to the pooled session)
+        host_concurrency: Maximum concurrent requests to the GitHub API
+        seen: Optional seen-set; a commit shared by several repositories is
+            analyzed for whichever repository fetches it first
         
-        print(f"✓ Analyzed {len(commits)} commits")
-        print(f"  Positive: {result['positive_count']} ({result['positive_percentage']:.1f}%)")
-        print(f"  Neutral:  {result['neutral_count']} ({result['neutral_percentage']:.1f}%)")
-        print(f"  Negative: {result['negative_count']} ({result['negative_percentage']:.1f}%)")
-        print(f"  Average: {result['average_compound']:.3f}")
+    Returns:
+        List of analysis result dictionaries in the order the repositories were given
+    """
+    fetchers = [
+        AsyncCommitFetcher(owner, repo, session=session, host_concurrency=host_concurrency, seen=seen)
+        for owner, repo in repos
+    ]
+    all_commits = await asyncio.gather(
+        *(fetcher.fetch_commits(limit=limit) for fetcher in fetchers),
+        return_exceptions=True
+    )
+    
+    results = []
+    for (owner, repo), commits in zip(repos, all_commits):
+        print(f"\n{'='*70}")
+        print(f"Analyzing: {owner}/{repo}")
+        print(f"{'='*70}")
         
-        return result
+        if isinstance(commits, Exception):
+            print(f"✗ Error analyzing {owner}/{repo}: {commits}")
+            continue
         
-    except Exception as e:
-        print(f"✗ Error analyzing {owner}/{repo}: {e}")
-        return None
+        try:
+            result = summarize_repository(owner, repo, commits)
+        except Exception as e:
+            print(f"✗ Error analyzing {owner}/{repo}: {e}")
+            continue
+        if result:
+            results.append(result)
+    
+    return results
 
 
 def compare_repositories(results: List[Dict]):
@@ -131,10 +203,19 @@ Examples:
   
   # Save comparison to file
   python analyze_multiple_repos.py microsoft/vscode facebook/react --output comparison.txt
+  
+  # Fetch all repositories concurrently
+  python analyze_multiple_repos.py microsoft/vscode facebook/react tensorflow/tensorflow --async
+  
+  # Analyze a repository and its forks, scoring shared commits only once
+  python analyze_multiple_repos.py torvalds/linux someone/linux-fork --dedupe
+  
+  # Crawl the 50 most recently active repositories of an organization
+  python analyze_multiple_repos.py --org microsoft --max-repos 50 --workers 8
         """
     )
     
-    parser.add_argument('repositories', nargs='+', 
+    parser.add_argument('repositories', nargs='*',
                        help='Repository names in format owner/repo (e.g., microsoft/vscode)')
     parser.add_argument('--limit', type=int, default=200,
                        help='Number of commits to analyze per repository (default: 200)')
@@ -142,6 +223,24 @@ Examples:
                        help='Output file to save comparison results')
     parser.add_argument('--validate', action='store_true',
                        help='Run validation checks for each repository')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                       help=f'HTTP connection pool size shared by all repositories (default: {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                       help='Fetch all repositories concurrently on one event loop')
+    parser.add_argument('--host-concurrency', type=int, default=DEFAULT_HOST_CONCURRENCY,
+                       help=f'Maximum concurrent API requests with --async (default: {DEFAULT_HOST_CONCURRENCY})')
+    parser.add_argument('--dedupe', action='store_true',
+                       help='Skip commits already analyzed for an earlier repository (forks, mirrors)')
+    parser.add_argument('--org', type=str,
+                       help='Crawl every repository of this organization instead of listing repositories')
+    parser.add_argument('--sort', choices=PRIORITIES, default='activity',
+                       help='Crawl order with --org: most recently pushed or largest first (default: activity)')
+    parser.add_argument('--max-repos', type=int,
+                       help='Only crawl this many repositories with --org')
+    parser.add_argument('--include-forks', action='store_true',
+                       help='Also crawl repositories that are forks with --org')
+    parser.add_argument('--workers', type=int, default=DEFAULT_CRAWL_WORKERS,
+                       help=f'Repositories analyzed at the same time with --org (default: {DEFAULT_CRAWL_WORKERS})')
     
     args = parser.parse_args()
     
@@ -157,20 +256,44 @@ Examples:
         else:
             print(f"⚠️  Repository must be in format owner/repo: {repo_str}")
     
-    if not repos_to_analyze:
+    if not repos_to_analyze and not args.org:
         print("Error: No valid repositories provided")
         sys.exit(1)
     
     print(f"\n{'='*70}")
-    print(f"ANALYZING {len(repos_to_analyze)} REPOSITORY(IES)")
+    if args.org:
+        print(f"ANALYZING REPOSITORIES OF {args.org}")
+    else:
+        print(f"ANALYZING {len(repos_to_analyze)} REPOSITORY(IES)")
     print(f"{'='*70}")
     
+    # One pooled session keeps connections warm across every repository
+    session = get_shared_session(pool_size=args.pool_size)
+    seen = SeenCommits() if args.dedupe else None
+    
     # Analyze each repository
-    results = []
-    for owner, repo in repos_to_analyze:
-        result = analyze_repository(owner, repo, limit=args.limit)
-        if result:
-            results.append(result)
+    if args.org:
+        crawler = OrgCrawler(args.org, session=session, max_workers=args.workers)
+        try:
+            results = crawler.crawl(
+                lambda owner, repo: analyze_repository(owner, repo, limit=args.limit,
+                                                       session=session, seen=seen),
+                by=args.sort, max_repos=args.max_repos, include_forks=args.include_forks
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"Error listing repositories of {args.org}: {e}")
+            sys.exit(1)
+    elif args.use_async:
+        results = asyncio.run(analyze_repositories_async(
+            repos_to_analyze, limit=args.limit, session=session,
+            host_concurrency=args.host_concurrency, seen=seen
+        ))
+    else:
+        results = []
+        for owner, repo in repos_to_analyze:
+            result = analyze_repository(owner, repo, limit=args.limit, session=session, seen=seen)
+            if result:
+                results.append(result)
     
     # Compare results
     if len(results) > 1:
@@ -207,6 +330,13 @@ Examples:
         print(f"\n✓ Results saved to {args.output}")
     
     print(f"\n✅ Analysis complete! Analyzed {len(results)} repository(ies)")
+    
+    if seen is not None and seen.skipped:
+        print(f"Skipped {seen.skipped} commit(s) already analyzed for another repository")
+    
+    remaining = get_shared_scheduler().remaining
+    if remaining is not None:
+        print(f"GitHub API requests remaining: {remaining}")
 
 
 if __name__ == '__main__':
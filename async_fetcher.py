@@ -0,0 +1,146 @@
+"""
+Asynchronous Commit Fetcher
+Fetches commit messages from many GitHub repositories on a single asyncio event loop.
+"""
+
+import asyncio
+import weakref
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from commit_analyzer import CommitFetcher, SeenCommits, DEFAULT_POOL_SIZE
+from http_cache import ResponseCache
+from rate_limit import RateLimitScheduler
+
+
+DEFAULT_HOST_CONCURRENCY = 8
+
+# Semaphores belong to the loop they were first awaited on, so keep one set per loop
+_host_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def get_host_semaphore(host: str, limit: int = DEFAULT_HOST_CONCURRENCY) -> asyncio.Semaphore:
+    """
+    Return the semaphore bounding in-flight requests to a host on the running loop.
+    
+    Args:
+        host: Host name requests are sent to
+        limit: Maximum concurrent requests (only used when the semaphore is created)
+        
+    Returns:
+        Semaphore shared by every fetcher talking to the host
+    """
+    loop = asyncio.get_running_loop()
+    semaphores = _host_semaphores.setdefault(loop, {})
+    if host not in semaphores:
+        semaphores[host] = asyncio.Semaphore(limit)
+    return semaphores[host]
+
+
+class AsyncCommitFetcher:
+    """
+    Fetches commit messages from GitHub using asyncio.
+    
+    Each blocking page request runs in the event loop's executor on the shared
+    pooled session. Requests are bounded by a per-host semaphore, so the number
+    of threads in use depends on the host limit, not on the number of repositories.
+    """
+    
+    def __init__(self, owner: str, repo: str, token: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 host_concurrency: int = DEFAULT_HOST_CONCURRENCY,
+                 cache: Optional[ResponseCache] = None,
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 api_url: Optional[str] = None,
+                 seen: Optional[SeenCommits] = None):
+        """
+        Initialize the asynchronous commit fetcher.
+        
+        Args:
+            owner: GitHub repository owner (username or organization)
+            repo: Repository name
+            token: GitHub access token to use instead of the shared token pool
+            session: Session to send requests with (defaults to a shared pooled session)
+            pool_size: Connection pool size used when creating the shared session
+            host_concurrency: Maximum concurrent requests per host across all fetchers
+            cache: Optional on-disk cache used to revalidate pages with ETags
+            scheduler: Token pool to draw requests from (defaults to the shared pool)
+            api_url: Root URL of the GitHub API (defaults to GITHUB_API_URL)
+            seen: Optional seen-set shared with fetchers of related repositories
+        """
+        self.owner = owner
+        self.repo = repo
+        self.host_concurrency = host_concurrency
+        self._fetcher = CommitFetcher(owner, repo, token=token, session=session,
+                                      pool_size=pool_size, cache=cache, scheduler=scheduler,
+                                      api_url=api_url, seen=seen)
+        self.host = urlparse(self._fetcher.base_url).netloc
+    
+    async def iter_commits(self, limit: int = 200, per_page: int = 100) -> AsyncIterator[Dict]:
+        """
+        Yield commits newest first, one page request at a time.
+        
+        Args:
+            limit: Maximum number of commits to yield
+            per_page: Number of commits per API request (max 100)
+            
+        Yields:
+            Commit dictionaries with sha, message, date and author
+        """
+        per_page = min(per_page, 100)
+        count = 0
+        page = 1
+        
+        while count < limit:
+            data = await self._get_page(page, per_page)
+            
+            if not data:
+                return
+            
+            commits, shared = self._fetcher._claim(
+                [CommitFetcher._parse_commit(commit) for commit in data], limit - count)
+            for commit in commits:
+                yield commit
+            count += len(commits)
+            
+            if shared or count >= limit or len(data) < per_page:
+                return
+            
+            page += 1
+    
+    async def fetch_commits(self, limit: int = 200, per_page: int = 100) -> List[Dict]:
+        """
+        Fetch commits into a list, mirroring CommitFetcher.fetch_commits.
+        
+        Args:
+            limit: Maximum number of commits to fetch
+            per_page: Number of commits per API request (max 100)
+            
+        Returns:
+            List of commit dictionaries; on errors, the commits fetched before the failure
+        """
+        print(f"Fetching commits from {self.owner}/{self.repo}...")
+        
+        commits = []
+        try:
+            async for commit in self.iter_commits(limit, per_page):
+                commits.append(commit)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching commits for {self.owner}/{self.repo}: {e}")
+            if commits:
+                # Keep the pages that were fetched before the failure
+                print(f"Keeping {len(commits)} commits fetched before the error")
+        
+        print(f"Found {len(commits)} commits in {self.owner}/{self.repo}")
+        return commits
+    
+    async def _get_page(self, page: int, per_page: int) -> List[Dict]:
+        """Request one page of raw commits while holding the host semaphore."""
+        async with get_host_semaphore(self.host, self.host_concurrency):
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, self._fetcher._get_page, page, per_page)
+            return response.json()
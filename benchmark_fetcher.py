@@ -0,0 +1,67 @@
+"""
+Benchmark commit fetching against the local fake GitHub server
+Compares serial, concurrent, GraphQL and asyncio fetching without network access
+"""
+import argparse
+import asyncio
+import time
+
+from async_fetcher import AsyncCommitFetcher
+from commit_analyzer import CommitFetcher, DEFAULT_MAX_WORKERS
+from fake_github import FakeGitHubServer, make_synthetic_commits, load_recorded_commits
+from rate_limit import RateLimitScheduler
+
+
+def run_mode(mode: str, server: FakeGitHubServer, limit: int, workers: int) -> int:
+    """Fetch with one mode and return the number of commits received."""
+    fetcher = CommitFetcher(server.owner, server.repo, api_url=server.url,
+                            scheduler=RateLimitScheduler(['benchmark-token']))
+    if mode == 'serial':
+        return len(fetcher.fetch_commits(limit=limit))
+    if mode == 'concurrent':
+        return len(fetcher.fetch_commits(limit=limit, concurrent=True, max_workers=workers))
+    if mode == 'graphql':
+        return len(fetcher.fetch_commits(limit=limit, graphql=True))
+    if mode == 'async':
+        async_fetcher = AsyncCommitFetcher(server.owner, server.repo, api_url=server.url,
+                                           scheduler=RateLimitScheduler(['benchmark-token']))
+        return len(asyncio.run(async_fetcher.fetch_commits(limit=limit)))
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def main():
+    """Main entry point for the fetcher benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark CommitFetcher against a local fake GitHub API')
+    parser.add_argument('--commits', type=int, default=2000,
+                       help='Number of synthetic commits served (default: 2000)')
+    parser.add_argument('--recording', type=str,
+                       help='Serve commits from a response archive or JSON file instead')
+    parser.add_argument('--limit', type=int, default=2000,
+                       help='Commits fetched per run (default: 2000)')
+    parser.add_argument('--latency', type=float, default=0.05,
+                       help='Seconds of latency per request (default: 0.05)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                       help=f'Workers for concurrent mode (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--modes', nargs='+', default=['serial', 'concurrent', 'graphql', 'async'],
+                       help='Modes to run (default: serial concurrent graphql async)')
+    args = parser.parse_args()
+    
+    commits = load_recorded_commits(args.recording) if args.recording else make_synthetic_commits(args.commits)
+    
+    rows = []
+    with FakeGitHubServer(commits, latency=args.latency) as server:
+        for mode in args.modes:
+            requests_before = server.request_count
+            start = time.perf_counter()
+            count = run_mode(mode, server, args.limit, args.workers)
+            elapsed = time.perf_counter() - start
+            rows.append((mode, count, server.request_count - requests_before, elapsed))
+    
+    print(f"\n{'Mode':<12} {'Commits':<10} {'Requests':<10} {'Seconds':<10} {'Commits/s':<10}")
+    print("-" * 56)
+    for mode, count, request_count, elapsed in rows:
+        print(f"{mode:<12} {count:<10} {request_count:<10} "
+              f"{elapsed:<10.2f} {count / elapsed if elapsed > 0 else 0:<10.0f}")
+
+if __name__ == '__main__':
+    main()
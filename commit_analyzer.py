@@ -3,105 +3,849 @@ Commit Message Sentiment Analyzer
 Fetches and analyzes GitHub commit messages using sentiment analysis.
 """
 
+import itertools
+import math
+import os
+import threading
 import requests
-from datetime import datetime
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime, timezone
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 import time
 
+from http_cache import ResponseCache
+from message_normalizer import MessageNormalizer
+from rate_limit import RateLimitScheduler, get_shared_scheduler
+from response_archive import ResponseArchive
+from resilience import (CircuitBreaker, RetryPolicy, RETRY_EXCEPTIONS, RETRY_STATUS_CODES,
+                        get_circuit_breaker)
+
+
+DEFAULT_API_URL = 'https://api.github.com'
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_SHARDS = 8
+REQUEST_TIMEOUT = 30
+
+# Only the four fields used for analysis are requested from the commit history
+HISTORY_QUERY = """
+query($owner: String!, $repo: String!, $first: Int!, $after: String, $since: GitTimestamp,
+      $until: GitTimestamp, $path: String, $author: CommitAuthor) {
+  repository(owner: $owner, name: $repo) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $after, since: $since, until: $until,
+                  path: $path, author: $author) {
+            pageInfo { hasNextPage endCursor }
+            nodes { oid message authoredDate committedDate author { name } }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+# Normalizer behind format_commit_message, which only keeps the subject line
+_SUBJECT_NORMALIZER = MessageNormalizer(subject_only=True)
+
+_shared_sessions: Dict[Tuple[Optional[str], int], requests.Session] = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def create_session(token: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Create a keep-alive HTTP session configured for the GitHub API.
+    
+    Args:
+        token: Optional GitHub access token sent as a bearer token
+        pool_size: Maximum number of pooled connections per host
+        
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept': 'application/vnd.github+json',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    })
+    if token:
+        session.headers['Authorization'] = f"Bearer {token}"
+    return session
+
+
+def get_shared_session(token: Optional[str] = None, pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Return a process-wide session so fetchers reuse warm connections.
+    
+    Sessions are shared between all fetchers using the same token and pool size.
+    
+    Args:
+        token: Optional GitHub access token
+        pool_size: Maximum number of pooled connections per host
+        
+    Returns:
+        Shared requests.Session
+    """
+    key = (token, pool_size)
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(key)
+        if session is None:
+            session = create_session(token, pool_size)
+            _shared_sessions[key] = session
+        return session
+
+
+class GraphQLError(requests.exceptions.RequestException):
+    """Raised when the GraphQL API answers with errors instead of data."""
+
+
+class HighWaterMark:
+    """Marks the newest commit seen by a previous run of an incremental fetch."""
+    
+    def __init__(self, sha: Optional[str] = None, date: Optional[str] = None):
+        """
+        Initialize the high-water mark.
+        
+        Args:
+            sha: Newest commit SHA from the previous run (full or abbreviated)
+            date: Newest commit timestamp from the previous run (ISO 8601)
+        """
+        self.sha = sha
+        self.date = _parse_timestamp(date) if date else None
+    
+    def params(self) -> Dict:
+        """Query parameters that let GitHub skip commits older than the mark."""
+        if self.date is None:
+            return {}
+        return {'since': _format_timestamp(self.date)}
+    
+    def filter(self, data: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Keep the raw commits of a page that are newer than the mark.
+        
+        Args:
+            data: Raw commit objects from one API page, newest first
+            
+        Returns:
+            Tuple of (new commits, whether the marked commit was reached)
+        """
+        new_commits = []
+        for commit in data:
+            if self.is_marked(commit['sha']):
+                return new_commits, True
+            if self.is_older(commit['commit']['committer']['date']):
+                continue
+            new_commits.append(commit)
+        return new_commits, False
+    
+    def is_marked(self, sha: str) -> bool:
+        """Whether a commit is the marked commit itself."""
+        return bool(self.sha) and sha.startswith(self.sha)
+    
+    def is_older(self, committed_date: str) -> bool:
+        """
+        Whether a commit was committed no later than the marked date.
+        
+        The since parameter of both APIs is inclusive, so the boundary commit
+        itself is returned by the server and has to be dropped here.
+        """
+        return self.date is not None and _parse_timestamp(committed_date) <= self.date
+
+
+class CommitFilters:
+    """Commit list filters sent to the server, so only the matching commits are downloaded."""
+    
+    def __init__(self, author: Optional[str] = None, path: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None):
+        """
+        Initialize the filters.
+        
+        Args:
+            author: GitHub login or email address of the commit author
+            path: Only commits touching this file or directory
+            since: Only commits after this ISO 8601 date or timestamp
+            until: Only commits before this ISO 8601 date or timestamp
+        """
+        self.author = author
+        self.path = path
+        self.since = _parse_timestamp(since) if since else None
+        self.until = _parse_timestamp(until) if until else None
+    
+    def __bool__(self) -> bool:
+        return any(value is not None for value in (self.author, self.path, self.since, self.until))
+    
+    def params(self, extra_params: Optional[Dict] = None) -> Dict:
+        """
+        Query parameters for the filters combined with those of one request.
+        
+        When both restrict the dates, the narrower range is kept, so a
+        high-water mark or a date window never widens the filtered range.
+        
+        Args:
+            extra_params: Parameters of the request (e.g. since from a high-water mark)
+            
+        Returns:
+            Combined query parameters
+        """
+        params = dict(extra_params or {})
+        if self.author:
+            params['author'] = self.author
+        if self.path:
+            params['path'] = self.path
+        if self.since and (not params.get('since') or _parse_timestamp(params['since']) < self.since):
+            params['since'] = _format_timestamp(self.since)
+        if self.until and (not params.get('until') or _parse_timestamp(params['until']) > self.until):
+            params['until'] = _format_timestamp(self.until)
+        return params
+
+
+class SeenCommits:
+    """
+    Content-addressed set of the commits that were already fetched for analysis.
+    
+    A commit's SHA is the hash of its content, so a commit reached again
+    through a fork or mirror has the same SHA and is only analyzed once.
+    The set is thread-safe and can be shared by many fetchers.
+    """
+    
+    def __init__(self, shas: Iterable[str] = ()):
+        """
+        Initialize the seen-set.
+        
+        Args:
+            shas: Full SHAs of commits that were analyzed already
+        """
+        self._shas = set(shas)
+        self._lock = threading.Lock()
+        self.skipped = 0
+    
+    def __contains__(self, sha: str) -> bool:
+        return sha in self._shas
+    
+    def __len__(self) -> int:
+        return len(self._shas)
+    
+    def claim(self, commits: List[Dict], limit: Optional[int] = None) -> Tuple[List[Dict], bool]:
+        """
+        Mark the commits that were not seen yet as seen and return them.
+        
+        Args:
+            commits: Commit dictionaries with full SHAs
+            limit: Maximum number of commits to claim (None for all of them)
+            
+        Returns:
+            Tuple of (claimed commits, whether every commit had been seen already)
+        """
+        claimed = []
+        all_seen = bool(commits)
+        with self._lock:
+            for commit in commits:
+                if commit['sha'] in self._shas:
+                    self.skipped += 1
+                    continue
+                all_seen = False
+                if limit is not None and len(claimed) >= limit:
+                    break
+                self._shas.add(commit['sha'])
+                claimed.append(commit)
+        return claimed, all_seen
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp into a timezone-aware UTC datetime."""
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _format_timestamp(value: datetime) -> str:
+    """Format a datetime the way the GitHub API expects timestamps."""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def split_date_range(since: str, until: Optional[str] = None,
+                     shards: int = DEFAULT_SHARDS) -> List[Tuple[str, str]]:
+    """
+    Split a time range into equally long since/until windows.
+    
+    Neighbouring windows share their boundary timestamp, so a commit on a
+    boundary is returned by both and has to be deduplicated by the caller.
+    
+    Args:
+        since: Start of the range as an ISO 8601 timestamp
+        until: End of the range as an ISO 8601 timestamp (defaults to now)
+        shards: Number of windows
+        
+    Returns:
+        List of (since, until) timestamp pairs, newest window first
+    """
+    start = _parse_timestamp(since)
+    end = _parse_timestamp(until) if until else datetime.now(timezone.utc)
+    if end <= start:
+        raise ValueError(f"until ({end.isoformat()}) must be later than since ({start.isoformat()})")
+    
+    shards = max(1, shards)
+    step = (end - start) / shards
+    bounds = [_format_timestamp(start + step * i) for i in range(shards)] + [_format_timestamp(end)]
+    return [(bounds[i], bounds[i + 1]) for i in reversed(range(shards))]
+
 
 class CommitFetcher:
     """Fetches commit messages from GitHub repositories."""
     
-    def __init__(self, owner: str, repo: str):
+    def __init__(self, owner: str, repo: str, token: Optional[str] = None,
+                 session: Optional[requests.Session] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 cache: Optional[ResponseCache] = None,
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 api_url: Optional[str] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 archive: Optional[ResponseArchive] = None,
+                 seen: Optional[SeenCommits] = None,
+                 filters: Optional[CommitFilters] = None):
         """
         Initialize the commit fetcher.
         
         Args:
             owner: GitHub repository owner (username or organization)
             repo: Repository name
+            token: GitHub access token to use instead of the shared token pool
+            session: Session to send requests with (defaults to a shared pooled session)
+            pool_size: Connection pool size used when creating the shared session
+            cache: Optional on-disk cache used to revalidate pages with ETags
+            scheduler: Token pool to draw requests from (defaults to the shared pool
+                built from the GITHUB_TOKENS / GITHUB_TOKEN environment variables)
+            api_url: Root URL of the GitHub API (defaults to the GITHUB_API_URL
+                environment variable, then DEFAULT_API_URL)
+            retry_policy: Backoff used to retry failed requests (defaults to RetryPolicy())
+            circuit_breaker: Breaker guarding the API host (defaults to the
+                process-wide breaker for the host)
+            archive: Optional archive every received page is appended to
+            seen: Optional seen-set shared with fetchers of related repositories
+                (forks, mirrors). Commits in it are skipped, and pagination stops
+                at the first page made only of them, where the shared history begins.
+            filters: Optional author/path/date filters applied by the server to
+                every request
         """
         self.owner = owner
         self.repo = repo
-        self.base_url = f"https://api.github.com/repos/{owner}/{repo}/commits"
+        self.api_url = (api_url or os.environ.get('GITHUB_API_URL') or DEFAULT_API_URL).rstrip('/')
+        self.base_url = f"{self.api_url}/repos/{owner}/{repo}/commits"
+        self.graphql_url = f"{self.api_url}/graphql"
+        if scheduler is None:
+            scheduler = RateLimitScheduler([token]) if token else get_shared_scheduler()
+        self.scheduler = scheduler
+        self.session = session if session is not None else get_shared_session(pool_size=pool_size)
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker
+        self.archive = archive
+        self.seen = seen
+        self.filters = filters or CommitFilters()
         
-    def fetch_commits(self, limit: int = 200, per_page: int = 100) -> List[Dict]:
+    def fetch_commits(self, limit: Optional[int] = 200, per_page: int = 100,
+                      concurrent: bool = False,
+                      max_workers: int = DEFAULT_MAX_WORKERS,
+                      since_sha: Optional[str] = None,
+                      since_date: Optional[str] = None,
+                      graphql: bool = False) -> List[Dict]:
         """
         Fetch commit messages from GitHub.
         
         Args:
-            limit: Maximum number of commits to fetch
+            limit: Maximum number of commits to fetch (None for the full history)
             per_page: Number of commits per API request (max 100)
+            concurrent: Fetch the remaining pages in parallel, using the
+                Link header of the first response to find the last page
+            max_workers: Maximum number of pages fetched at the same time
+            since_sha: High-water mark from a previous run; pagination stops
+                at this commit (full or abbreviated SHA)
+            since_date: High-water mark as an ISO 8601 timestamp; only commits
+                committed after it are returned
+            graphql: Use the GraphQL commit history instead of the REST
+                endpoint (requires a token, ignores concurrent)
             
         Returns:
             List of dictionaries containing commit data (message, date, sha)
         """
-        commits = []
-        page = 1
-        
         print(f"Fetching commits from {self.owner}/{self.repo}...")
         
+        if graphql:
+            pages = self.iter_pages_graphql(limit, per_page, since_sha, since_date)
+        elif concurrent:
+            mark = HighWaterMark(since_sha, since_date)
+            pages = self._iter_pages_concurrent(limit, per_page, max_workers, mark)
+        else:
+            pages = self.iter_pages(limit, per_page, since_sha, since_date)
+        
+        commits = []
         try:
-            while len(commits) < limit:
-                params = {
-                    'per_page': min(per_page, limit - len(commits)),
-                    'page': page
-                }
-                
-                response = requests.get(self.base_url, params=params)
-                
-                # Handle rate limiting
-                if response.status_code == 403:
-                    if 'rate limit' in response.text.lower():
-                        print("Rate limit exceeded. Waiting 60 seconds...")
-                        time.sleep(60)
-                        continue
-                    
-                response.raise_for_status()
-                data = response.json()
-                
-                if not data:
-                    break
-                
-                for commit in data:
-                    commit_info = {
-                        'sha': commit['sha'][:7],
-                        'message': commit['commit']['message'],
-                        'date': commit['commit']['author']['date'],
-                        'author': commit['commit']['author']['name']
-                    }
-                    commits.append(commit_info)
-                    
-                    if len(commits) >= limit:
-                        break
-                
-                if len(data) < per_page:
-                    break
-                    
-                page += 1
-                
-                # Be respectful to GitHub API
-                time.sleep(0.1)
-                
+            for page in pages:
+                commits.extend(page)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching commits: {e}")
             if "404" in str(e):
                 print(f"Repository {self.owner}/{self.repo} not found or is private.")
-            return []
+            elif commits:
+                # Keep the pages that were fetched before the failure
+                print(f"Keeping {len(commits)} commits fetched before the error")
         
         print(f"Found {len(commits)} commits")
         return commits
     
+    def iter_pages(self, limit: Optional[int] = None, per_page: int = 100,
+                   since_sha: Optional[str] = None,
+                   since_date: Optional[str] = None) -> Iterator[List[Dict]]:
+        """
+        Yield commits one API page at a time, walking the pages in order.
+        
+        Only the current page is held in memory, so the history can be
+        consumed incrementally no matter how long it is.
+        
+        Args:
+            limit: Maximum number of commits to yield (None for the full history)
+            per_page: Number of commits per API request (max 100)
+            since_sha: High-water mark; pagination stops at this commit
+            since_date: High-water mark as an ISO 8601 timestamp
+            
+        Yields:
+            Lists of commit dictionaries, newest first
+        """
+        per_page = min(per_page, 100)
+        mark = HighWaterMark(since_sha, since_date)
+        count = 0
+        
+        for data in self._iter_raw_pages(per_page, mark.params()):
+            new_commits, reached = mark.filter(data)
+            commits, shared = self._claim([self._parse_commit(commit) for commit in new_commits],
+                                          None if limit is None else limit - count)
+            
+            if commits:
+                count += len(commits)
+                yield commits
+            
+            if reached or shared or (limit is not None and count >= limit):
+                return
+    
+    def fetch_commits_sharded(self, since: str, until: Optional[str] = None,
+                              shards: int = DEFAULT_SHARDS,
+                              max_workers: int = DEFAULT_MAX_WORKERS,
+                              per_page: int = 100,
+                              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Fetch a time range by splitting it into date windows fetched in parallel.
+        
+        Every window is paged through on its own with since/until parameters,
+        so no request has to go deep into the page numbers of a long history.
+        The windows are merged newest first and deduplicated on the full SHA.
+        Once the newest windows hold limit commits, the older windows can only
+        add older commits, so they are cancelled.
+        
+        Args:
+            since: Start of the range as an ISO 8601 timestamp
+            until: End of the range as an ISO 8601 timestamp (defaults to now)
+            shards: Number of date windows
+            max_workers: Maximum number of windows fetched at the same time
+            per_page: Number of commits per API request (max 100)
+            limit: Maximum number of commits to return, newest first
+                (None for the whole range)
+            
+        Returns:
+            List of dictionaries containing commit data (message, date, sha)
+        """
+        windows = split_date_range(since, until, shards)
+        print(f"Fetching commits from {self.owner}/{self.repo} in {len(windows)} date windows...")
+        
+        merged = {}
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(self._fetch_window, start, end, per_page, stop)
+                       for start, end in windows]
+            # Windows are collected newest first, so ties keep the API order
+            for (start, end), future in zip(windows, futures):
+                try:
+                    for commit in future.result():
+                        merged.setdefault(commit['sha'], commit)
+                except requests.exceptions.RequestException as e:
+                    print(f"Error fetching commits between {start} and {end}: {e}")
+                
+                if limit is not None and self._unseen_count(merged) >= limit:
+                    break
+        finally:
+            # Windows already running stop after their current page
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        raw_commits = sorted(merged.values(), reverse=True,
+                             key=lambda commit: _parse_timestamp(commit['commit']['committer']['date']))
+        commits, _ = self._claim([self._parse_commit(commit) for commit in raw_commits], limit)
+        print(f"Found {len(commits)} commits")
+        return commits
+    
+    def _fetch_window(self, since: str, until: str, per_page: int,
+                      stop: Optional[threading.Event] = None) -> List[Dict]:
+        """Fetch every raw commit committed inside one date window, unless stopped."""
+        commits = []
+        for data in self._iter_raw_pages(min(per_page, 100), {'since': since, 'until': until}):
+            commits.extend(data)
+            if stop is not None and stop.is_set():
+                break
+        return commits
+    
+    def _unseen_count(self, raw_commits: Dict[str, Dict]) -> int:
+        """Count the fetched commits that are not in the seen-set, without claiming them."""
+        if self.seen is None:
+            return len(raw_commits)
+        return sum(1 for sha in raw_commits if sha not in self.seen)
+    
+    def _iter_raw_pages(self, per_page: int, params: Dict) -> Iterator[List[Dict]]:
+        """Yield raw API pages in order until a short or empty page is returned."""
+        page = 1
+        while True:
+            data = self._get_page(page, per_page, params).json()
+            if data:
+                yield data
+            if len(data) < per_page:
+                return
+            
+            page += 1
+            
+            # Be respectful to GitHub API
+            time.sleep(0.1)
+    
+    def iter_commits(self, limit: Optional[int] = None, per_page: int = 100,
+                     since_sha: Optional[str] = None,
+                     since_date: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield commits one at a time, fetching a new page only when needed.
+        
+        Args:
+            limit: Maximum number of commits to yield (None for the full history)
+            per_page: Number of commits per API request (max 100)
+            since_sha: High-water mark; pagination stops at this commit
+            since_date: High-water mark as an ISO 8601 timestamp
+            
+        Yields:
+            Commit dictionaries with sha, message, date and author
+        """
+        for page in self.iter_pages(limit, per_page, since_sha, since_date):
+            yield from page
+    
+    def iter_pages_graphql(self, limit: Optional[int] = None, per_page: int = 100,
+                           since_sha: Optional[str] = None,
+                           since_date: Optional[str] = None) -> Iterator[List[Dict]]:
+        """
+        Yield pages of commits from the GraphQL history of the default branch.
+        
+        The query projects only sha, message, date and author, so each page is
+        a fraction of the size of the equivalent REST page.
+        
+        Args:
+            limit: Maximum number of commits to yield (None for the full history)
+            per_page: Number of commits per request (max 100)
+            since_sha: High-water mark; pagination stops at this commit
+            since_date: Only return commits after this ISO 8601 timestamp
+            
+        Yields:
+            Lists of commit dictionaries, newest first
+        """
+        per_page = min(per_page, 100)
+        mark = HighWaterMark(since_sha, since_date)
+        filters = self.filters.params(mark.params())
+        author = filters.get('author')
+        if author and '@' not in author:
+            raise GraphQLError("The GraphQL history can only filter authors by email address")
+        cursor = None
+        count = 0
+        
+        while limit is None or count < limit:
+            variables = {
+                'owner': self.owner,
+                'repo': self.repo,
+                'first': per_page,
+                'after': cursor,
+                'since': filters.get('since'),
+                'until': filters.get('until'),
+                'path': filters.get('path'),
+                'author': {'emails': [author]} if author else None
+            }
+            history = self._post_graphql(HISTORY_QUERY, variables)
+            
+            commits = []
+            reached = False
+            for node in history['nodes']:
+                if mark.is_marked(node['oid']):
+                    reached = True
+                    break
+                if mark.is_older(node['committedDate']):
+                    continue
+                commits.append(self._parse_history_node(node))
+            commits, shared = self._claim(commits, None if limit is None else limit - count)
+            
+            if commits:
+                count += len(commits)
+                yield commits
+            
+            if reached or shared or not history['pageInfo']['hasNextPage']:
+                return
+            cursor = history['pageInfo']['endCursor']
+    
+    def _iter_pages_concurrent(self, limit: Optional[int], per_page: int, max_workers: int,
+                               mark: 'HighWaterMark') -> Iterator[List[Dict]]:
+        """Fetch the first page, then the remaining pages in parallel, yielding them in order."""
+        per_page = min(per_page, 100)
+        params = mark.params()
+        response = self._get_page(1, per_page, params)
+        first_page = response.json()
+        
+        last_page = self._last_page_number(response)
+        pages_needed = last_page if limit is None else min(last_page, math.ceil(limit / per_page))
+        
+        # Nothing older than the high-water mark is needed
+        if mark.filter(first_page)[1]:
+            pages_needed = 1
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            # map() yields results in page order regardless of completion order
+            pages = itertools.chain([first_page], executor.map(
+                lambda page: self._get_page(page, per_page, params).json(),
+                range(2, pages_needed + 1)
+            ))
+            
+            count = 0
+            seen = set()
+            for data in pages:
+                new_commits, reached = mark.filter(data)
+                commits = []
+                for commit in new_commits:
+                    # Pages can shift while new commits land, so drop repeats
+                    if commit['sha'] in seen:
+                        continue
+                    seen.add(commit['sha'])
+                    commits.append(self._parse_commit(commit))
+                
+                commits, shared = self._claim(commits, None if limit is None else limit - count)
+                count += len(commits)
+                if commits:
+                    yield commits
+                
+                if reached or shared or (limit is not None and count >= limit):
+                    return
+        finally:
+            # Don't keep fetching pages nobody will read after an error or early stop
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _get_page(self, page: int, per_page: int,
+                  extra_params: Optional[Dict] = None) -> requests.Response:
+        """
+        Request a single page of commits, waiting out rate limits.
+        
+        Each attempt uses the token with the most remaining budget. When the
+        rate limit is hit, the request is retried once the scheduler finds a
+        token with budget left, sleeping until the real reset time if needed.
+        
+        When a cache is configured the request is conditional, and a 304 Not
+        Modified answer is served from the cached copy of the page. When an
+        archive is configured, every page returned is appended to it.
+        
+        Args:
+            page: Page number (1-based)
+            per_page: Number of commits per page
+            extra_params: Additional query parameters, combined with the fetcher's filters
+            
+        Returns:
+            Successful response for the page
+        """
+        params = {
+            'per_page': per_page,
+            'page': page,
+            **self.filters.params(extra_params)
+        }
+        
+        cached = self.cache.get(self.base_url, params) if self.cache else None
+        headers = ResponseCache.conditional_headers(cached)
+        
+        response = self._request('GET', self.base_url, params=params, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            self.cache.hits += 1
+            response = ResponseCache.to_response(cached)
+        else:
+            response.raise_for_status()
+            if self.cache:
+                self.cache.misses += 1
+                self.cache.put(self.base_url, params, response)
+        
+        if self.archive:
+            self.archive.append(self.owner, self.repo, 'rest', self.base_url, params, response.json())
+        return response
+    
+    def _post_graphql(self, query: str, variables: Dict) -> Dict:
+        """
+        Run a commit history query and return its history connection.
+        
+        Args:
+            query: GraphQL query text
+            variables: Query variables
+            
+        Returns:
+            The history object with pageInfo and nodes
+        """
+        response = self._request('POST', self.graphql_url, json={'query': query, 'variables': variables})
+        response.raise_for_status()
+        payload = response.json()
+        
+        if payload.get('errors'):
+            raise GraphQLError('; '.join(error.get('message', str(error)) for error in payload['errors']))
+        
+        repository = (payload.get('data') or {}).get('repository')
+        if not repository:
+            raise GraphQLError(f"Repository {self.owner}/{self.repo} not found")
+        branch = repository.get('defaultBranchRef')
+        if not branch:
+            return {'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []}
+        
+        history = branch['target']['history']
+        if self.archive:
+            self.archive.append(self.owner, self.repo, 'graphql', self.graphql_url, variables, history)
+        return history
+    
+    def _request(self, method: str, url: str, headers: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """
+        Send a request with a token from the scheduler, retrying on failures.
+        
+        Rate-limited requests are retried once the scheduler has budget again.
+        Connection errors, timeouts and 5xx responses are retried with
+        exponential backoff and jitter. Every outcome is reported to the host's
+        circuit breaker, which fails requests fast while the host is down.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            headers: Extra request headers
+            **kwargs: Further arguments for requests.Session.request
+            
+        Returns:
+            First response that was neither rate limited nor a retryable failure,
+            or the last 5xx response once retries are exhausted
+            
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+            requests.exceptions.RequestException: If the last retry failed to connect
+        """
+        host = urlparse(url).netloc
+        breaker = self.circuit_breaker or get_circuit_breaker(host)
+        attempt = 0
+        
+        while True:
+            breaker.before_request(host)
+            token = self.scheduler.acquire()
+            request_headers = dict(headers or {})
+            if token:
+                request_headers['Authorization'] = f"Bearer {token}"
+            
+            try:
+                response = self.session.request(method, url, headers=request_headers,
+                                                timeout=REQUEST_TIMEOUT, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                breaker.record_failure()
+                if attempt >= self.retry_policy.max_retries:
+                    raise
+                print(f"Request failed ({e.__class__.__name__}). Retrying...")
+                self.retry_policy.wait(attempt)
+                attempt += 1
+                continue
+            except Exception:
+                # Not worth retrying, but the breaker must still hear of it, or a
+                # half-open trial would stay in flight and block the host for good
+                breaker.record_failure()
+                raise
+            self.scheduler.update(token, response)
+            
+            # Handle rate limiting
+            if self.scheduler.is_rate_limited(response):
+                breaker.record_success()
+                print("Rate limit exceeded. Retrying when quota is available...")
+                continue
+            
+            if response.status_code in RETRY_STATUS_CODES:
+                breaker.record_failure()
+                if attempt >= self.retry_policy.max_retries:
+                    return response
+                print(f"Server error {response.status_code}. Retrying...")
+                self.retry_policy.wait(attempt)
+                attempt += 1
+                continue
+            
+            breaker.record_success()
+            return response
+    
+    def _claim(self, commits: List[Dict], limit: Optional[int]) -> Tuple[List[Dict], bool]:
+        """
+        Drop the commits in the seen-set and cap the rest at the limit.
+        
+        Returns:
+            Tuple of (commits to analyze, whether the page was all shared history)
+        """
+        if self.seen is not None:
+            return self.seen.claim(commits, limit)
+        return (commits if limit is None else commits[:limit]), False
+    
+    @staticmethod
+    def _last_page_number(response: requests.Response) -> int:
+        """Read the page number of the rel="last" link, defaulting to the current page."""
+        last = response.links.get('last')
+        if not last:
+            return 1
+        query = parse_qs(urlparse(last['url']).query)
+        return int(query.get('page', ['1'])[0])
+    
+    @staticmethod
+    def _parse_history_node(node: Dict) -> Dict:
+        """Convert a GraphQL history node to the same shape as _parse_commit."""
+        return {
+            'sha': node['oid'],
+            'short_sha': node['oid'][:7],
+            'message': node['message'],
+            'date': node['authoredDate'],
+            'author': (node.get('author') or {}).get('name')
+        }
+    
+    @staticmethod
+    def _parse_commit(commit: Dict) -> Dict:
+        """Reduce a raw API commit object to the fields used for analysis."""
+        return {
+            'sha': commit['sha'],
+            'short_sha': commit['sha'][:7],
+            'message': commit['commit']['message'],
+            'date': commit['commit']['author']['date'],
+            'author': commit['commit']['author']['name']
+        }
+    
     def format_commit_message(self, message: str) -> str:
         """
         Clean and format commit message (remove extra whitespace, etc.)
         
+        The message goes through a subject-only MessageNormalizer, so the
+        first line left after trailers, URLs and code are stripped is kept.
+        
         Args:
             message: Raw commit message
             
         Returns:
             Cleaned commit message
         """
-        # Split by newlines and take the first line (subject)
-        lines = message.strip().split('\n')
-        return lines[0].strip()
+        return _SUBJECT_NORMALIZER.normalize(message)
 
@@ -0,0 +1,219 @@
+"""
+Compiled Lexicon
+Stores VADER's lexicon and emoji table in a binary file that is memory-mapped
+instead of parsed, so analyzers start without reading VADER's text files.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from importlib import metadata
+from typing import Dict, List, Optional
+
+import numpy as np
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+
+DEFAULT_LEXICON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vader.lexicon')
+
+# magic, format revision, word count, then the byte lengths of the version,
+# words, emoji and emoji description sections
+_HEADER = struct.Struct('<8sIIIIII')
+_MAGIC = b'VADERLEX'
+_FORMAT_REVISION = 1
+
+
+def vader_version() -> str:
+    """Installed vaderSentiment version; its lexicon can change between releases."""
+    try:
+        return metadata.version('vaderSentiment')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+class CompiledLexicon:
+    """VADER's word valences and emoji descriptions, as loaded from a compiled file."""
+    
+    def __init__(self, words: List[str], valences: np.ndarray, emojis: Dict[str, str],
+                 version: str):
+        """
+        Initialize the lexicon.
+        
+        Args:
+            words: Lexicon words, in file order
+            valences: Valence of each word (may be a read-only memory-mapped array)
+            emojis: Emoji characters mapped to their descriptions
+            version: vaderSentiment version the lexicon was compiled from
+        """
+        self.words = words
+        self.valences = valences
+        self.emojis = emojis
+        self.version = version
+    
+    @classmethod
+    def from_vader(cls, analyzer: Optional[SentimentIntensityAnalyzer] = None) -> 'CompiledLexicon':
+        """Compile the lexicon of a VADER analyzer (parsing VADER's files if none is given)."""
+        analyzer = analyzer or SentimentIntensityAnalyzer()
+        return cls(list(analyzer.lexicon), np.fromiter(analyzer.lexicon.values(), dtype='<f8'),
+                   dict(analyzer.emojis), vader_version())
+    
+    def save(self, path: str = DEFAULT_LEXICON_FILE):
+        """
+        Write the lexicon to a compiled file.
+        
+        Args:
+            path: File to write; replaced atomically
+        """
+        version = self.version.encode('utf-8')
+        words = '\n'.join(self.words).encode('utf-8')
+        # Emojis and descriptions are stored apart so each is decoded with one split
+        emojis = '\n'.join(self.emojis).encode('utf-8')
+        descriptions = '\n'.join(self.emojis.values()).encode('utf-8')
+        header = _HEADER.pack(_MAGIC, _FORMAT_REVISION, len(self.words), len(version), len(words),
+                              len(emojis), len(descriptions))
+        # Pad so the valence array starts 8-byte aligned
+        padding = b'\0' * (-(len(header) + len(version)) % 8)
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header + version + padding)
+            f.write(np.asarray(self.valences, dtype='<f8').tobytes())
+            f.write(words)
+            f.write(emojis)
+            f.write(descriptions)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path: str = DEFAULT_LEXICON_FILE) -> 'CompiledLexicon':
+        """
+        Memory-map a compiled lexicon file.
+        
+        The valences are a read-only view of the mapped file; only the word
+        and emoji sections are decoded.
+        
+        Args:
+            path: Compiled lexicon file
+        
+        Returns:
+            CompiledLexicon
+        
+        Raises:
+            ValueError: If the file is not a compiled lexicon of this format
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(mapped) < _HEADER.size:
+            raise ValueError(f"{path} is not a compiled lexicon")
+        magic, revision, count, version_size, words_size, emojis_size, descriptions_size = \
+            _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or revision != _FORMAT_REVISION:
+            raise ValueError(f"{path} is not a compiled lexicon of format {_FORMAT_REVISION}")
+        
+        offset = _HEADER.size
+        version = mapped[offset:offset + version_size].decode('utf-8')
+        offset += version_size + (-(offset + version_size) % 8)
+        valences = np.frombuffer(mapped, dtype='<f8', count=count, offset=offset)
+        offset += valences.nbytes
+        words = mapped[offset:offset + words_size].decode('utf-8').split('\n')
+        offset += words_size
+        emojis = mapped[offset:offset + emojis_size].decode('utf-8').split('\n')
+        offset += emojis_size
+        descriptions = mapped[offset:offset + descriptions_size].decode('utf-8').split('\n')
+        
+        if len(words) != count or len(emojis) != len(descriptions):
+            raise ValueError(f"{path} is truncated")
+        return cls(words, valences, dict(zip(emojis, descriptions)), version)
+    
+    def make_analyzer(self) -> SentimentIntensityAnalyzer:
+        """Build a VADER analyzer from this lexicon without reading VADER's text files."""
+        analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        analyzer.lexicon = dict(zip(self.words, self.valences.tolist()))
+        analyzer.emojis = self.emojis
+        return analyzer
+
+
+def load_lexicon(path: str = DEFAULT_LEXICON_FILE) -> CompiledLexicon:
+    """
+    Load the compiled lexicon, compiling it first if it is missing or stale.
+    
+    The file is recompiled when it was built from another vaderSentiment
+    version. If it cannot be written, the lexicon is still returned.
+    
+    Args:
+        path: Compiled lexicon file
+    
+    Returns:
+        CompiledLexicon for the installed vaderSentiment
+    """
+    try:
+        lexicon = CompiledLexicon.load(path)
+        if lexicon.version == vader_version():
+            return lexicon
+    except (OSError, ValueError):
+        pass
+    
+    lexicon = CompiledLexicon.from_vader()
+    try:
+        lexicon.save(path)
+    except OSError as e:
+        print(f"Warning: could not write compiled lexicon {path}: {e}")
+    return lexicon
+
+
+_shared_lexicon: Optional[CompiledLexicon] = None
+_shared_vader: Optional[SentimentIntensityAnalyzer] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_lexicon() -> CompiledLexicon:
+    """
+    Return the process-wide compiled lexicon, loading it on first use.
+    
+    Returns:
+        Shared CompiledLexicon
+    """
+    global _shared_lexicon
+    with _shared_lock:
+        if _shared_lexicon is None:
+            _shared_lexicon = load_lexicon()
+        return _shared_lexicon
+
+
+def get_shared_vader() -> SentimentIntensityAnalyzer:
+    """
+    Return a process-wide VADER analyzer built from the compiled lexicon.
+    
+    polarity_scores keeps no state between calls, so one analyzer can serve
+    every SentimentAnalyzer in the process.
+    
+    Returns:
+        Shared SentimentIntensityAnalyzer
+    """
+    global _shared_vader
+    lexicon = get_shared_lexicon()
+    with _shared_lock:
+        if _shared_vader is None:
+            _shared_vader = lexicon.make_analyzer()
+        return _shared_vader
+
+
+def main():
+    """Compile the lexicon ahead of time, e.g. when installing a commit hook."""
+    parser = argparse.ArgumentParser(description='Compile the VADER lexicon into a memory-mappable file')
+    parser.add_argument('--output', type=str, default=DEFAULT_LEXICON_FILE,
+                       help=f'File to write (default: {DEFAULT_LEXICON_FILE})')
+    args = parser.parse_args()
+    
+    lexicon = CompiledLexicon.from_vader()
+    lexicon.save(args.output)
+    print(f"✓ Compiled {len(lexicon.words)} words and {len(lexicon.emojis)} emojis "
+          f"(vaderSentiment {lexicon.version}) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
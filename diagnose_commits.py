@@ -52,7 +52,7 @@ print(f"  Average commits per day: {daily_counts.mean():.1f}")
 # Show first few commits
 print("\n[6] Sample Commits (first 5):")
 for idx, row in df.head(5).iterrows():
-    print(f"  {row['sha']}: {row['date'].strftime('%Y-%m-%d')} - {row['message'][:50]}...")
+    print(f"  {row['sha'][:7]}: {row['date'].strftime('%Y-%m-%d')} - {row['message'][:50]}...")
 
 print("\n" + "="*70)
 print("DIAGNOSIS COMPLETE")
@@ -0,0 +1,450 @@
+"""
+Fake GitHub API
+A local stand-in for the GitHub commits endpoints, for tests and offline benchmarks.
+
+Supports page-number pagination with Link headers, author/path/since/until
+filters, ETags, rate-limit headers, configurable latency and injected error
+responses. Several repositories of one owner can be served at once, together
+with the organization's repository listing. Point any fetcher at it with
+CommitFetcher(api_url=server.url) or the GITHUB_API_URL environment variable.
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse, parse_qs
+
+
+_SAMPLE_MESSAGES = [
+    "Fix crash when opening large files",
+    "Add support for custom themes",
+    "Update README.md",
+    "Merge pull request #{n} from user/feature-{n}",
+    "Improve startup performance",
+    "Revert broken change to the parser",
+    "Refactor settings loader",
+    "Bump lodash from 4.17.{n} to 4.17.{m}",
+]
+
+# Every synthetic developer works in one area, so path and author filters overlap
+_SAMPLE_PATHS = [
+    "src/editor/view.ts",
+    "src/workbench/layout.ts",
+    "extensions/git/main.ts",
+    "build/gulpfile.js",
+    "docs/README.md",
+]
+
+
+def make_synthetic_commits(count: int, seed: int = 0,
+                           start: Optional[datetime] = None) -> List[Dict]:
+    """
+    Generate raw REST commit objects, newest first.
+    
+    Args:
+        count: Number of commits to generate
+        seed: Random seed, so the same arguments always give the same commits
+        start: Timestamp of the newest commit (defaults to 2024-01-01 UTC)
+        
+    Returns:
+        List of commit objects shaped like GitHub's /commits response
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    commits = []
+    for i in range(count):
+        date = (start - timedelta(minutes=37 * i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        message = rng.choice(_SAMPLE_MESSAGES).format(n=count - i, m=count - i + 1)
+        developer = rng.randrange(20)
+        signature = {'name': f"dev{developer}", 'email': f"dev{developer}@example.com", 'date': date}
+        commits.append({
+            'sha': hashlib.sha1(f"{seed}:{i}".encode()).hexdigest(),
+            'commit': {'message': message, 'author': dict(signature), 'committer': dict(signature)},
+            'files': [{'filename': _SAMPLE_PATHS[developer % len(_SAMPLE_PATHS)]}],
+        })
+    return commits
+
+
+def load_recorded_commits(path: str) -> List[Dict]:
+    """
+    Load raw REST commit objects recorded earlier.
+    
+    Accepts a ResponseArchive file (.jsonl.gz) or a JSON file holding a list
+    of commit objects as returned by the /commits endpoint.
+    
+    Args:
+        path: Path of the recording
+        
+    Returns:
+        List of raw commit objects without duplicates, in recorded order
+    """
+    if path.endswith('.gz'):
+        commits = []
+        seen = set()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['kind'] != 'rest':
+                    continue
+                for commit in record['data']:
+                    if commit['sha'] not in seen:
+                        seen.add(commit['sha'])
+                        commits.append(commit)
+        return commits
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp as sent in the since/until parameters."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class FakeGitHubServer:
+    """Serves fixed commit histories over the REST and GraphQL commit endpoints."""
+    
+    def __init__(self, commits: List[Dict], owner: str = 'octo', repo: str = 'demo',
+                 latency: float = 0.0, rate_limit: Optional[int] = None,
+                 rate_limit_window: float = 3600.0, error_rate: float = 0.0,
+                 error_status: int = 502, seed: int = 0,
+                 repositories: Optional[Dict[str, List[Dict]]] = None):
+        """
+        Initialize the fake server.
+        
+        Args:
+            commits: Raw REST commit objects, newest first
+            owner: Repository owner the server answers for
+            repo: Repository name the server answers for
+            latency: Seconds to wait before answering each request
+            rate_limit: Requests allowed per token and window (None for unlimited)
+            rate_limit_window: Seconds until an exhausted budget resets
+            error_rate: Probability of answering a request with error_status
+            error_status: Status code used for random errors
+            seed: Seed for the random error injection
+            repositories: Commits of further repositories of the same owner, by name
+        """
+        self.commits = commits
+        self.owner = owner
+        self.repo = repo
+        self.repositories = {repo: commits, **(repositories or {})}
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.request_count = 0
+        self.status_counts: Dict[int, int] = {}
+        self._rng = random.Random(seed)
+        self._queued_errors: List[Tuple[int, Optional[int]]] = []
+        self._budgets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @classmethod
+    def from_recording(cls, path: str, **kwargs) -> 'FakeGitHubServer':
+        """
+        Create a server seeded with recorded commits (see load_recorded_commits).
+        
+        Args:
+            path: Path of the recording
+            **kwargs: Further FakeGitHubServer arguments
+            
+        Returns:
+            New, not yet started server
+        """
+        return cls(load_recorded_commits(path), **kwargs)
+    
+    @property
+    def url(self) -> str:
+        """Root URL to pass to CommitFetcher as api_url."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def fail_next(self, status: int, count: int = 1, page: Optional[int] = None):
+        """
+        Answer the next requests with an error status.
+        
+        Args:
+            status: Status code to send (e.g. 403, 502)
+            count: Number of requests to fail
+            page: Only fail requests for this REST page number
+        """
+        with self._lock:
+            self._queued_errors.extend([(status, page)] * count)
+    
+    def start(self) -> 'FakeGitHubServer':
+        """Start serving on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop the server and release its port."""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> 'FakeGitHubServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def _next_error(self, page: Optional[int]) -> Optional[int]:
+        """Pick the injected error for the current request, if any."""
+        with self._lock:
+            for i, (status, error_page) in enumerate(self._queued_errors):
+                if error_page is None or error_page == page:
+                    del self._queued_errors[i]
+                    return status
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self.error_status
+        return None
+    
+    def _charge(self, token: str, counted: bool) -> Dict[str, str]:
+        """
+        Charge a request to a token's budget and build its rate-limit headers.
+        
+        Args:
+            token: Authorization header value ('' when unauthenticated)
+            counted: Whether the request uses up budget (304 answers do not)
+            
+        Returns:
+            Rate-limit headers, or an empty dict when rate limiting is off
+        """
+        if self.rate_limit is None:
+            return {}
+        with self._lock:
+            now = time.time()
+            budget = self._budgets.get(token)
+            if budget is None or now >= budget[1]:
+                budget = [self.rate_limit, now + self.rate_limit_window]
+                self._budgets[token] = budget
+            if counted and budget[0] > 0:
+                budget[0] -= 1
+            return {
+                'X-RateLimit-Limit': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(budget[0]),
+                'X-RateLimit-Reset': str(int(budget[1])),
+            }
+    
+    def _exhausted(self, token: str) -> bool:
+        if self.rate_limit is None:
+            return False
+        with self._lock:
+            budget = self._budgets.get(token)
+            return budget is not None and budget[0] <= 0 and time.time() < budget[1]
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                per_page = min(int(query.get('per_page', 30)), 100)
+                page = int(query.get('page', 1))
+                if not self._begin(page):
+                    return
+                
+                parts = parsed.path.strip('/').split('/')
+                if parsed.path in (f"/orgs/{server.owner}/repos", f"/users/{server.owner}/repos"):
+                    items = server._repository_listing()
+                elif (len(parts) == 4 and parts[0] == 'repos' and parts[1] == server.owner
+                        and parts[2] in server.repositories and parts[3] == 'commits'):
+                    items = server._select(query, parts[2])
+                else:
+                    self._send_json(404, {'message': 'Not Found'})
+                    return
+                
+                body = json.dumps(items[(page - 1) * per_page:page * per_page]).encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b'', {'ETag': etag}, counted=False)
+                    return
+                
+                headers = {'ETag': etag, 'Content-Type': 'application/json; charset=utf-8'}
+                link = server._link_header(parsed.path, query, page, per_page, len(items))
+                if link:
+                    headers['Link'] = link
+                self._send(200, body, headers)
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not self._begin():
+                    return
+                if urlparse(self.path).path != '/graphql':
+                    self._send_json(404, {'message': 'Not Found'})
+                    return
+                payload = json.loads(body or b'{}')
+                self._send_json(200, server._graphql_history(payload.get('variables') or {}))
+            
+            def _begin(self, page: Optional[int] = None) -> bool:
+                """Apply latency, injected errors and rate limits; False if already answered."""
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                
+                error = server._next_error(page)
+                if error is not None:
+                    message = 'API rate limit exceeded' if error == 403 else 'Injected error'
+                    self._send_json(error, {'message': message}, counted=False)
+                    return False
+                
+                if server._exhausted(self.headers.get('Authorization', '')):
+                    self._send_json(403, {'message': 'API rate limit exceeded'}, counted=False)
+                    return False
+                return True
+            
+            def _send_json(self, status: int, payload, counted: bool = True):
+                body = json.dumps(payload).encode('utf-8')
+                self._send(status, body, {'Content-Type': 'application/json; charset=utf-8'}, counted)
+            
+            def _send(self, status: int, body: bytes, headers: Dict[str, str], counted: bool = True):
+                headers = dict(headers)
+                headers.update(server._charge(self.headers.get('Authorization', ''), counted))
+                with server._lock:
+                    server.status_counts[status] = server.status_counts.get(status, 0) + 1
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        return Handler
+    
+    def _select(self, query: Dict[str, str], repo: Optional[str] = None) -> List[Dict]:
+        """Apply the commit list filters supported by the endpoint."""
+        commits = self.repositories[repo or self.repo]
+        if query.get('author'):
+            author = query['author']
+            commits = [c for c in commits
+                       if author in (c['commit']['author']['name'], c['commit']['author']['email'])]
+        if query.get('path'):
+            path = query['path'].rstrip('/')
+            commits = [c for c in commits
+                       if any(f['filename'] == path or f['filename'].startswith(path + '/')
+                              for f in c.get('files', []))]
+        if query.get('since'):
+            since = _parse_date(query['since'])
+            commits = [c for c in commits if _parse_date(c['commit']['committer']['date']) >= since]
+        if query.get('until'):
+            until = _parse_date(query['until'])
+            commits = [c for c in commits if _parse_date(c['commit']['committer']['date']) <= until]
+        return commits
+    
+    def _link_header(self, path: str, query: Dict[str, str], page: int,
+                     per_page: int, total: int) -> str:
+        """Build a GitHub-style Link header for a page."""
+        last_page = max(1, -(-total // per_page))
+        
+        def link(target: int, rel: str) -> str:
+            params = dict(query, page=target, per_page=per_page)
+            return f'<{self.url}{path}?{urlencode(params)}>; rel="{rel}"'
+        
+        links = []
+        if page < last_page:
+            links += [link(page + 1, 'next'), link(last_page, 'last')]
+        if page > 1:
+            links += [link(1, 'first'), link(page - 1, 'prev')]
+        return ', '.join(links)
+    
+    def _repository_listing(self) -> List[Dict]:
+        """Describe the served repositories like the /orgs/{org}/repos endpoint."""
+        return [
+            {
+                'name': name,
+                'full_name': f"{self.owner}/{name}",
+                'owner': {'login': self.owner},
+                'pushed_at': commits[0]['commit']['committer']['date'] if commits else None,
+                'size': len(commits),
+                'fork': False,
+                'archived': False,
+            }
+            for name, commits in self.repositories.items()
+        ]
+    
+    def _graphql_history(self, variables: Dict) -> Dict:
+        """Answer the commit history query used by CommitFetcher.iter_pages_graphql."""
+        if variables.get('owner') != self.owner or variables.get('repo') not in self.repositories:
+            return {'data': {'repository': None},
+                    'errors': [{'message': 'Could not resolve to a Repository'}]}
+        
+        query = {name: variables.get(name) for name in ('since', 'until', 'path')}
+        if variables.get('author'):
+            query['author'] = variables['author']['emails'][0]
+        commits = self._select(query, variables['repo'])
+        
+        offset = int(base64.b64decode(variables['after']).decode()) if variables.get('after') else 0
+        end = offset + int(variables['first'])
+        nodes = [
+            {
+                'oid': c['sha'],
+                'message': c['commit']['message'],
+                'authoredDate': c['commit']['author']['date'],
+                'committedDate': c['commit']['committer']['date'],
+                'author': {'name': c['commit']['author']['name']},
+            }
+            for c in commits[offset:end]
+        ]
+        page_info = {
+            'hasNextPage': end < len(commits),
+            'endCursor': base64.b64encode(str(end).encode()).decode(),
+        }
+        history = {'pageInfo': page_info, 'nodes': nodes}
+        return {'data': {'repository': {'defaultBranchRef': {'target': {'history': history}}}}}
+
+
+def main():
+    """Run the fake server in the foreground."""
+    parser = argparse.ArgumentParser(description='Serve a fake GitHub commits API on localhost')
+    parser.add_argument('--commits', type=int, default=1000,
+                       help='Number of synthetic commits to serve (default: 1000)')
+    parser.add_argument('--recording', type=str,
+                       help='Serve commits from a response archive or JSON file instead')
+    parser.add_argument('--owner', default='octo', help='Repository owner (default: octo)')
+    parser.add_argument('--repo', default='demo', help='Repository name (default: demo)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                       help='Seconds of latency added to every request')
+    parser.add_argument('--rate-limit', type=int,
+                       help='Requests allowed per token per hour (default: unlimited)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=502,
+                       help='Status code for injected errors (default: 502)')
+    args = parser.parse_args()
+    
+    commits = load_recorded_commits(args.recording) if args.recording else make_synthetic_commits(args.commits)
+    server = FakeGitHubServer(commits, owner=args.owner, repo=args.repo, latency=args.latency,
+                              rate_limit=args.rate_limit, error_rate=args.error_rate,
+                              error_status=args.error_status)
+    server.start()
+    print(f"Serving {len(commits)} commits for {args.owner}/{args.repo} at {server.url}")
+    print(f"Use: GITHUB_API_URL={server.url} python main.py {args.owner} {args.repo}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,11 @@
 """Get actual vscode statistics"""
 from commit_analyzer import CommitFetcher
+from http_cache import ResponseCache
 from sentiment_analyzer import SentimentAnalyzer
 import pandas as pd
 
 print("Starting analysis...")
-fetcher = CommitFetcher('microsoft', 'vscode')
+fetcher = CommitFetcher('microsoft', 'vscode', cache=ResponseCache())
 commits = fetcher.fetch_commits(limit=200)
 print(f"Fetched {len(commits)} commits")
 
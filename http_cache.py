@@ -0,0 +1,130 @@
+"""
+HTTP Response Cache
+Stores GitHub API responses on disk and revalidates them with conditional requests.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+DEFAULT_CACHE_DIR = '.github_cache'
+
+# Response headers kept alongside the body so a cached page behaves like a fresh one
+_STORED_HEADERS = ('ETag', 'Last-Modified', 'Link', 'Content-Type')
+
+
+class ResponseCache:
+    """On-disk cache of API responses keyed by URL and query parameters."""
+    
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        """
+        Initialize the response cache.
+        
+        Args:
+            directory: Directory the cached responses are stored in
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """
+        Build a stable cache key from a URL and its query parameters.
+        
+        Args:
+            url: Request URL without query string
+            params: Query parameters
+            
+        Returns:
+            Hex digest identifying the request
+        """
+        canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def get(self, url: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Look up a cached entry.
+        
+        Args:
+            url: Request URL without query string
+            params: Query parameters
+            
+        Returns:
+            Entry with 'headers' and 'body', or None if nothing is cached
+        """
+        try:
+            with open(self._path(self.make_key(url, params)), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def put(self, url: str, params: Optional[Dict], response: requests.Response):
+        """
+        Store a successful response if it carries a validator.
+        
+        Args:
+            url: Request URL without query string
+            params: Query parameters
+            response: Response with status 200
+        """
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        if 'ETag' not in headers and 'Last-Modified' not in headers:
+            return
+        
+        entry = {'url': url, 'headers': headers, 'body': response.text}
+        
+        # Write to a temporary file first so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(self.make_key(url, params)))
+    
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict:
+        """
+        Build If-None-Match / If-Modified-Since headers for a cached entry.
+        
+        Args:
+            entry: Cached entry, or None
+            
+        Returns:
+            Headers to send with the request
+        """
+        if not entry:
+            return {}
+        headers = {}
+        if 'ETag' in entry['headers']:
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if 'Last-Modified' in entry['headers']:
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+    
+    @staticmethod
+    def to_response(entry: Dict) -> requests.Response:
+        """
+        Rebuild a response object from a cached entry.
+        
+        Args:
+            entry: Cached entry
+            
+        Returns:
+            Response with status 200 whose json() and links match the cached page
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        return response
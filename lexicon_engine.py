@@ -0,0 +1,354 @@
+"""
+Lexicon Engine
+Scores whole batches of messages with VADER's rules using NumPy array operations.
+"""
+
+import string
+import threading
+from itertools import repeat
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import numpy as np
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT, C_INCR, N_SCALAR, NEGATE, SPECIAL_CASES, SentimentIntensityAnalyzer
+)
+
+from compiled_lexicon import CompiledLexicon, get_shared_lexicon, get_shared_vader
+
+# Normalization constant of VADER's compound score
+ALPHA = 15
+
+# Words VADER's rules look for by value
+_RULE_WORDS = ('no', 'or', 'nor', 'never', 'so', 'this', 'without', 'doubt',
+               'least', 'at', 'very', 'but')
+
+# Multi-word idioms and boosters only resolved by VADER's special case check
+_IDIOMS = [phrase.split() for phrase in list(SPECIAL_CASES) + list(BOOSTER_DICT) if ' ' in phrase]
+# Token placed between messages when a batch is split in one go
+_SEPARATOR = '\0'
+# Word IDs fit in 32 bits, so a bigram is packed into one 64-bit code
+_BIGRAM_SHIFT = 32
+# Distinct raw tokens remembered before the token table is cleared
+_MAX_TOKENS = 1 << 20
+
+
+def protected_words(lexicon: Iterable[str]) -> FrozenSet[str]:
+    """
+    Words that change VADER's scores by their presence.
+    
+    Replacing any other token by another leaves the scores unchanged, as long
+    as both read as unprotected words, neither contains "n't" and the token
+    keeps its ALL CAPS status.
+    
+    Args:
+        lexicon: Words of the VADER lexicon
+    
+    Returns:
+        Lowercase words looked up by the lexicon or by VADER's rules
+    """
+    words = set(lexicon) | set(BOOSTER_DICT) | set(NEGATE) | set(SPECIAL_CASES) | set(_RULE_WORDS)
+    words.update(word for idiom in _IDIOMS for word in idiom)
+    return frozenset(words)
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    """Round like Python's round(), which VADER uses; np.round can differ next to a tie."""
+    rounded = np.round(values, digits)
+    scaled = values * 10.0 ** digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(value, digits) for value in values[near_tie].tolist()]
+    return rounded
+
+
+class _Vocabulary(dict):
+    """Maps raw tokens to IDs of the word VADER sees after stripping punctuation."""
+    
+    def __init__(self, engine: 'LexiconEngine'):
+        super().__init__()
+        self.engine = engine
+    
+    def __missing__(self, token: str) -> int:
+        stripped = token.strip(string.punctuation)
+        # VADER keeps the punctuation of very short tokens, e.g. emoticons
+        word = token if len(stripped) <= 2 else stripped
+        self[token] = self.engine._add_token(word)
+        return self[token]
+
+
+class LexiconEngine:
+    """
+    Batch implementation of VADER's polarity_scores.
+    
+    Messages are tokenized once into integer token IDs, word properties
+    (valence, booster value, negation) live in NumPy arrays indexed by word ID,
+    and every rule is applied to all tokens of the batch at the same time.
+    Only protected words get their own word ID; every other word reads as one
+    shared neutral word, so the word arrays never change after construction.
+    Messages with emojis or multi-word idioms are rare in commit messages and
+    are handed to VADER itself.
+    """
+    
+    def __init__(self, lexicon: Optional[CompiledLexicon] = None,
+                 analyzer: Optional[SentimentIntensityAnalyzer] = None):
+        """
+        Build the lookup arrays from a compiled lexicon.
+        
+        Args:
+            lexicon: Compiled VADER lexicon (defaults to the shared one)
+            analyzer: VADER analyzer for the messages the engine hands off
+                (defaults to the shared one)
+        """
+        self.lexicon = lexicon or get_shared_lexicon()
+        self.analyzer = analyzer or get_shared_vader()
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        # VADER only replaces emojis that are a single character
+        self._emojis = frozenset(emoji for emoji in self.lexicon.emojis if len(emoji) == 1)
+        
+        # Word IDs 0..n-1 are the lexicon words, followed by the other protected
+        # words and the two shared IDs of unprotected words, plain and with "n't"
+        lexicon_size = len(self.lexicon.words)
+        self._words: List[str] = list(self.lexicon.words)
+        self._words += sorted(protected_words(self._words) - set(self._words))
+        self._neutral_id = len(self._words)
+        self._negated_id = self._neutral_id + 1
+        self._words += ['', "n't"]
+        self._word_ids: Dict[str, int] = {word: word_id for word_id, word in enumerate(self._words)}
+        
+        in_lexicon = np.zeros(len(self._words), dtype=bool)
+        in_lexicon[:lexicon_size] = True
+        valence = np.zeros(len(self._words))
+        valence[:lexicon_size] = self.lexicon.valences
+        self._arrays = {
+            'valence': valence,
+            'in_lexicon': in_lexicon,
+            'booster': np.array([BOOSTER_DICT.get(word, 0.0) for word in self._words]),
+            'negation': np.array([word in NEGATE or "n't" in word for word in self._words]),
+        }
+        
+        self._rule_ids = {word: self._word_id(word) for word in _RULE_WORDS}
+        self._idiom_bigrams = np.array(sorted({
+            (self._word_id(words[0]) << _BIGRAM_SHIFT) | self._word_id(words[1]) for words in _IDIOMS
+        }), dtype=np.int64)
+        self._reset_tokens()
+    
+    def _reset_tokens(self):
+        """Forget all raw tokens; they are registered again as they reappear."""
+        # Token IDs index the distinct raw tokens; each maps to a word and a case flag
+        self._tokens = _Vocabulary(self)
+        self._token_word = np.empty(1024, dtype=np.int64)
+        self._token_upper = np.empty(1024, dtype=bool)
+        self._token_count = 0
+        self._separator = self._tokens[_SEPARATOR]
+    
+    def _word_id(self, word: str) -> int:
+        """Return the ID of a lowercase word; unprotected words share one of two IDs."""
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            return self._negated_id if "n't" in word else self._neutral_id
+        return word_id
+    
+    def _add_token(self, word: str) -> int:
+        """Register a raw token by the word it reads as and its case."""
+        token_id = self._token_count
+        if token_id == len(self._token_word):
+            # Grow geometrically so appending stays amortized constant time
+            self._token_word = np.concatenate((self._token_word, np.empty_like(self._token_word)))
+            self._token_upper = np.concatenate((self._token_upper, np.empty_like(self._token_upper)))
+        self._token_word[token_id] = self._word_id(word.lower())
+        self._token_upper[token_id] = word.isupper()
+        self._token_count += 1
+        return token_id
+    
+    def score(self, messages: List[str]) -> np.ndarray:
+        """
+        Score a batch of messages.
+        
+        Args:
+            messages: Message texts
+        
+        Returns:
+            (4, n) array of compound, positive, neutral and negative scores,
+            rounded like VADER's polarity_scores
+        """
+        # The vocabulary grows while a batch is tokenized, so batches are scored one at a time
+        with self._lock:
+            if self._token_count > _MAX_TOKENS:
+                self._reset_tokens()
+            return self._score(messages)
+    
+    def _score(self, messages: List[str]) -> np.ndarray:
+        """Score a batch of messages while holding the lock."""
+        count = len(messages)
+        if count == 0:
+            return np.empty((4, 0))
+        fallback = np.zeros(count, dtype=bool)
+        if '\0' in ''.join(messages):
+            fallback[[i for i, message in enumerate(messages) if '\0' in message]] = True
+        ascii_only = np.fromiter(map(str.isascii, messages), dtype=bool, count=count)
+        for i in np.flatnonzero(~ascii_only):
+            fallback[i] |= not self._emojis.isdisjoint(messages[i])
+        texts = [message if not skip else '' for message, skip in zip(messages, fallback.tolist())]
+        
+        # Tokenize the whole batch with one split, messages separated by a NUL token
+        tokens = f' {_SEPARATOR} '.join(texts).split()
+        token_ids = np.fromiter(map(self._tokens.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        separators = np.flatnonzero(token_ids == self._separator)
+        lengths = np.diff(np.concatenate(([-1], separators, [len(token_ids)]))) - 1
+        token_ids = np.delete(token_ids, separators)
+        exclamations = np.fromiter(map(str.count, texts, repeat('!')), dtype=float, count=count)
+        questions = np.fromiter(map(str.count, texts, repeat('?')), dtype=float, count=count)
+        
+        words = self._token_word[token_ids]
+        upper = self._token_upper[token_ids]
+        message_index = np.repeat(np.arange(count), lengths)
+        starts = np.cumsum(lengths) - lengths
+        position = np.arange(len(words)) - starts[message_index]
+        
+        # Idioms are looked up with VADER's own phrase tables
+        last = position == (lengths[message_index] - 1)
+        bigrams = (words[:-1] << _BIGRAM_SHIFT) | words[1:]
+        idiom = np.isin(bigrams, self._idiom_bigrams) & ~last[:-1]
+        fallback[message_index[:-1][idiom]] = True
+        
+        sentiments = self._sentiments(words, upper, message_index, position, last, lengths)
+        sentiments = self._but_rule(sentiments, words, message_index, position, starts, lengths)
+        values = self._aggregate(sentiments, message_index, lengths, exclamations, questions)
+        
+        for i in np.flatnonzero(fallback):
+            polarity = self.analyzer.polarity_scores(messages[i])
+            values[:, i] = (polarity['compound'], polarity['pos'], polarity['neu'], polarity['neg'])
+        self.fallbacks += int(np.count_nonzero(fallback))
+        return values
+    
+    def _sentiments(self, words: np.ndarray, upper: np.ndarray, message_index: np.ndarray,
+                    position: np.ndarray, last: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Valence of every token after VADER's booster, caps, negation and 'least' rules."""
+        arrays = self._arrays
+        in_lexicon = arrays['in_lexicon'][words]
+        booster = arrays['booster'][words]
+        negation = arrays['negation'][words]
+        
+        # Only lexicon words that are not boosters carry valence; the rules are
+        # evaluated for those tokens alone, looking back at their neighbours
+        scored = np.flatnonzero(in_lexicon & (booster == 0))
+        scored_position = position[scored]
+        
+        def before(values, distance, fill):
+            """Value of the token `distance` places before each scored token in its message."""
+            shifted = values[np.maximum(scored - distance, 0)]
+            return np.where(scored_position >= distance, shifted, fill)
+        
+        rule_words = {word: words == word_id for word, word_id in self._rule_ids.items()}
+        
+        def is_word(word, distance):
+            return before(rule_words[word], distance, False)
+        
+        # Some but not all tokens of the message are in capitals
+        upper_count = np.bincount(message_index, weights=upper, minlength=len(lengths))
+        cap_diff = ((upper_count > 0) & (upper_count < lengths))[message_index[scored]]
+        
+        lexicon_valence = arrays['valence'][words[scored]]
+        valence = lexicon_valence.copy()
+        
+        # 'no' followed by a lexicon word is neutral; a word after 'no' is negated
+        next_in_lexicon = in_lexicon[np.minimum(scored + 1, len(words) - 1)] & ~last[scored]
+        valence[rule_words['no'][scored] & next_in_lexicon] = 0.0
+        after_no = is_word('no', 1) | is_word('no', 2) | (
+            is_word('no', 3) & (is_word('or', 1) | is_word('nor', 1)))
+        valence = np.where(after_no, lexicon_valence * N_SCALAR, valence)
+        
+        capitals = upper[scored] & cap_diff
+        valence = np.where(capitals, np.where(valence > 0, valence + C_INCR, valence - C_INCR), valence)
+        
+        so_or_this = [None] + [is_word('so', d) | is_word('this', d) for d in (1, 2)]
+        for start in range(3):
+            distance = start + 1
+            # Rules only look back past words that carry no valence themselves
+            applies = ~before(in_lexicon, distance, True)
+            
+            scalar = before(booster, distance, 0.0)
+            scalar = np.where(valence < 0, -scalar, scalar)
+            boosted_capitals = (scalar != 0) & before(upper, distance, False) & cap_diff
+            scalar = np.where(boosted_capitals, np.where(valence > 0, scalar + C_INCR, scalar - C_INCR), scalar)
+            scalar *= (1.0, 0.95, 0.9)[start]
+            valence = np.where(applies, valence + scalar, valence)
+            
+            negated = before(negation, distance, False)
+            if start == 0:
+                emphasis = np.zeros_like(negated)
+                kept = emphasis
+            elif start == 1:
+                emphasis = is_word('never', 2) & so_or_this[1]
+                kept = is_word('without', 2) & is_word('doubt', 1)
+            else:
+                # VADER's operator precedence makes a bare 'so'/'this' before the word count too
+                emphasis = (is_word('never', 3) & so_or_this[2]) | so_or_this[1]
+                kept = is_word('without', 3) & (is_word('doubt', 2) | is_word('doubt', 1))
+            valence = np.where(applies & emphasis, valence * 1.25, valence)
+            valence = np.where(applies & ~emphasis & ~kept & negated, valence * N_SCALAR, valence)
+        
+        after_least = ~before(in_lexicon, 1, True) & is_word('least', 1)
+        intensified = is_word('at', 2) | is_word('very', 2)
+        valence = np.where(after_least & ~intensified, valence * N_SCALAR, valence)
+        
+        sentiments = np.zeros(len(words))
+        sentiments[scored] = valence
+        return sentiments
+    
+    def _but_rule(self, sentiments: np.ndarray, words: np.ndarray, message_index: np.ndarray,
+                  position: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Halve sentiment before the first 'but' of a message and add half after it."""
+        count = len(lengths)
+        is_but = words == self._rule_ids['but']
+        but_position = np.full(count, np.iinfo(np.int64).max)
+        np.minimum.at(but_position, message_index[is_but], position[is_but])
+        
+        pivot = but_position[message_index]
+        factor = np.where(position < pivot, 0.5, np.where(position > pivot, 1.5, 1.0))
+        factor[pivot == np.iinfo(np.int64).max] = 1.0
+        scaled = sentiments * factor
+        
+        # VADER finds each value with list.index, so equal values within a 'but'
+        # message can rescale the wrong token; replay its loop for those messages
+        nonzero = np.bincount(message_index, weights=sentiments != 0, minlength=count)
+        for i in np.flatnonzero((but_position < np.iinfo(np.int64).max) & (nonzero > 1)):
+            span = slice(starts[i], starts[i] + lengths[i])
+            replayed = SentimentIntensityAnalyzer._but_check(
+                [self._words[word] for word in words[span]], sentiments[span].tolist())
+            scaled[span] = replayed
+        return scaled
+    
+    @staticmethod
+    def _aggregate(sentiments: np.ndarray, message_index: np.ndarray, lengths: np.ndarray,
+                   exclamations: np.ndarray, questions: np.ndarray) -> np.ndarray:
+        """Combine token sentiments into VADER's compound, positive, neutral and negative scores."""
+        count = len(lengths)
+        total = np.bincount(message_index, weights=sentiments, minlength=count)
+        positive = np.bincount(message_index, weights=np.where(sentiments > 0, sentiments + 1, 0.0),
+                               minlength=count)
+        negative = np.bincount(message_index, weights=np.where(sentiments < 0, sentiments - 1, 0.0),
+                               minlength=count)
+        neutral = np.bincount(message_index, weights=sentiments == 0, minlength=count)
+        
+        # Exclamation and question marks amplify whichever way the message leans
+        amplifier = np.minimum(exclamations, 4) * 0.292 + np.where(
+            questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0.0)
+        total = total + np.sign(total) * amplifier
+        compound = np.clip(total / np.sqrt(total * total + ALPHA), -1.0, 1.0)
+        
+        leans_positive = positive > -negative
+        leans_negative = positive < -negative
+        positive = positive + np.where(leans_positive, amplifier, 0.0)
+        negative = negative - np.where(leans_negative, amplifier, 0.0)
+        denominator = positive - negative + neutral
+        denominator[denominator == 0] = 1.0
+        
+        values = np.array([
+            _round(compound, 4),
+            _round(np.abs(positive / denominator), 3),
+            _round(np.abs(neutral / denominator), 3),
+            _round(np.abs(negative / denominator), 3),
+        ])
+        values[:, lengths == 0] = 0.0
+        return values
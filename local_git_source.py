@@ -0,0 +1,155 @@
+"""
+Local Git Commit Source
+Reads commit messages straight from a local clone instead of the GitHub API.
+"""
+
+import os
+import subprocess
+from typing import Dict, Iterator, List, Optional
+
+from commit_analyzer import CommitFilters
+
+
+# Fields requested from git log, separated by NUL. With -z, git also ends
+# every commit record with a NUL, so the output is a flat stream of fields.
+_LOG_FORMAT = '%H%x00%aI%x00%an%x00%B'
+_FIELDS_PER_COMMIT = 4
+_READ_SIZE = 64 * 1024
+
+
+class LocalGitCommitSource:
+    """Streams commits from a local git repository."""
+    
+    def __init__(self, path: str, ref: str = 'HEAD', filters: Optional[CommitFilters] = None):
+        """
+        Initialize the local commit source.
+        
+        Args:
+            path: Path to a local git clone (working tree or bare repository)
+            ref: Branch, tag or commit to walk history from
+            filters: Optional author/path/date filters, passed on to git log
+        """
+        self.path = path
+        self.ref = ref
+        self.filters = filters or CommitFilters()
+        self.owner = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        self.repo = os.path.basename(os.path.abspath(path))
+    
+    @staticmethod
+    def is_git_repository(path: str) -> bool:
+        """
+        Check whether a path is the root of a local git repository.
+        
+        Subdirectories of a working tree do not count, so a directory that
+        happens to share a name with a GitHub owner is not mistaken for a clone.
+        
+        Args:
+            path: Filesystem path
+            
+        Returns:
+            True if the path is a working tree's top level or a git directory
+        """
+        if not os.path.isdir(path):
+            return False
+        # --show-toplevel fails outside a working tree (bare repositories), but
+        # the git directory is still printed before it
+        result = subprocess.run(
+            ['git', '-C', path, 'rev-parse', '--absolute-git-dir', '--show-toplevel'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        
+        def canonical(location: str) -> str:
+            return os.path.normcase(os.path.realpath(location))
+        
+        roots = result.stdout.decode('utf-8', errors='replace').splitlines()
+        return canonical(path) in {canonical(root) for root in roots if root}
+    
+    def iter_commits(self, limit: Optional[int] = None,
+                     since_sha: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield commits newest first without loading the whole history.
+        
+        git log output is read in fixed-size chunks and parsed incrementally,
+        so memory use does not grow with the length of the history.
+        
+        Args:
+            limit: Maximum number of commits to yield (None for the full history)
+            since_sha: Stop before this commit (full or abbreviated SHA)
+            
+        Yields:
+            Commit dictionaries with sha, message, date and author
+        """
+        command = ['git', '-C', self.path, 'log', '-z', f'--format={_LOG_FORMAT}']
+        if limit is not None:
+            command.append(f'--max-count={limit}')
+        if self.filters.author:
+            command.append(f'--author={self.filters.author}')
+        if self.filters.since:
+            command.append(f'--since={self.filters.since.isoformat()}')
+        if self.filters.until:
+            command.append(f'--until={self.filters.until.isoformat()}')
+        command.append(self.ref)
+        if self.filters.path:
+            command += ['--', self.filters.path]
+        
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            fields = []
+            buffer = b''
+            while True:
+                chunk = process.stdout.read(_READ_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+                *complete, buffer = buffer.split(b'\0')
+                for field in complete:
+                    fields.append(field)
+                    if len(fields) == _FIELDS_PER_COMMIT:
+                        if since_sha and fields[0].decode('ascii').startswith(since_sha):
+                            return
+                        yield self._make_commit(fields)
+                        fields = []
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            stderr = process.stderr.read().decode('utf-8', errors='replace')
+            process.stderr.close()
+            returncode = process.wait()
+        
+        if returncode not in (0, -9) and stderr:
+            raise RuntimeError(f"git log failed: {stderr.strip()}")
+    
+    def fetch_commits(self, limit: Optional[int] = 200, since_sha: Optional[str] = None) -> List[Dict]:
+        """
+        Fetch commits into a list, mirroring CommitFetcher.fetch_commits.
+        
+        Args:
+            limit: Maximum number of commits to fetch (None for the full history)
+            since_sha: High-water mark from a previous run; reading stops at this commit
+            
+        Returns:
+            List of commit dictionaries, empty if the history could not be read
+        """
+        print(f"Reading commits from local repository {self.path}...")
+        
+        try:
+            commits = list(self.iter_commits(limit, since_sha))
+        except (OSError, RuntimeError) as e:
+            print(f"Error reading commits: {e}")
+            return []
+        
+        print(f"Found {len(commits)} commits")
+        return commits
+    
+    @staticmethod
+    def _make_commit(fields: List[bytes]) -> Dict:
+        """Build a commit dictionary matching CommitFetcher's output."""
+        sha, date, author, message = (f.decode('utf-8', errors='replace') for f in fields)
+        return {
+            'sha': sha,
+            'short_sha': sha[:7],
+            'message': message.rstrip('\n'),
+            'date': date,
+            'author': author
+        }
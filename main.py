@@ -4,9 +4,18 @@ Commit Message Sentiment Analyzer - Entry Point
 """
 
 import argparse
+import os
 import sys
-from commit_analyzer import CommitFetcher
-from sentiment_analyzer import SentimentAnalyzer
+import pandas as pd
+import requests
+from commit_analyzer import CommitFetcher, CommitFilters, DEFAULT_MAX_WORKERS
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR
+from local_git_source import LocalGitCommitSource
+from message_normalizer import MessageNormalizer, DEFAULT_MAX_LENGTH
+from pipeline import analyze_pipelined, chunked
+from response_archive import ResponseArchive, ArchiveCommitSource, DEFAULT_ARCHIVE_DIR
+from score_store import ScoreStore, DEFAULT_SCORE_DB
+from sentiment_analyzer import RunningSummary, SentimentAnalyzer
 from visualizer import SentimentVisualizer
 from validator import ResultValidator
 
@@ -26,6 +35,13 @@ def print_summary(summary: dict):
     print("="*60 + "\n")
 
 
+def load_results(path: str) -> pd.DataFrame:
+    """Load results stored by a previous incremental run."""
+    df = pd.read_csv(path, dtype={'sha': str, 'message': str, 'author': str})
+    df['date'] = pd.to_datetime(df['date'], utc=True)
+    return df
+
+
 def main():
     """Main application entry point."""
     parser = argparse.ArgumentParser(
@@ -36,22 +52,85 @@ Examples:
   python main.py microsoft vscode
   python main.py facebook react --limit 100
   python main.py tensorflow tensorflow --limit 200 --output my_results.png
+  python main.py microsoft vscode --results-file vscode.csv   # only score new commits on re-runs
+  python main.py ./path/to/local/clone --limit 5000             # read history with git log, no API
+  python main.py ./path/to/local/clone --limit 0 --stream       # summarize the full history
+  python main.py microsoft vscode --archive                     # keep raw API pages on disk
+  python main.py microsoft vscode --replay --limit 0            # re-score archived pages offline
+  python main.py microsoft vscode --limit 0 --since 2020-01-01 --shards 16   # deep history in parallel
+  python main.py microsoft vscode --path extensions/git --since 2024-01-01   # one directory only
+  python main.py microsoft vscode --author octocat                           # one author only
         """
     )
     
-    parser.add_argument('owner', help='GitHub repository owner (username or organization)')
-    parser.add_argument('repo', nargs='?', help='Repository name (optional, can be part of owner/repo)')
+    parser.add_argument('owner', help='GitHub repository owner (username or organization), '
+                                      'or the path of a local git clone')
+    parser.add_argument('repo', nargs='?', help='Repository name (optional, can be part of owner/repo); '
+                                                'for a local clone, the branch or ref to read (default: HEAD)')
     parser.add_argument('--limit', type=int, default=200, 
-                       help='Maximum number of commits to analyze (default: 200)')
+                       help='Maximum number of commits to analyze (default: 200, 0 for no limit)')
     parser.add_argument('--output', type=str, default='sentiment_analysis.png',
                        help='Output file name for visualization (default: sentiment_analysis.png)')
     parser.add_argument('--validate', action='store_true',
                        help='Run validation checks on results')
+    parser.add_argument('--concurrent', action='store_true',
+                       help='Fetch commit pages in parallel using the Link header')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                       help=f'Maximum parallel page requests with --concurrent (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--author', type=str,
+                       help='Only analyze commits by this GitHub login or email address')
+    parser.add_argument('--path', type=str,
+                       help='Only analyze commits touching this file or directory')
+    parser.add_argument('--since', type=str,
+                       help='Only analyze commits after this ISO 8601 date or timestamp')
+    parser.add_argument('--until', type=str,
+                       help='Only analyze commits before this ISO 8601 date or timestamp')
+    parser.add_argument('--shards', type=int, default=1,
+                       help='Split the --since/--until range into this many date windows and '
+                            'fetch them in parallel, up to --workers at a time')
+    parser.add_argument('--graphql', action='store_true',
+                       help='Fetch only the needed commit fields through the GraphQL API (requires a token)')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                       help=f'Directory for cached API responses (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always download commits instead of revalidating cached responses')
+    parser.add_argument('--archive', action='store_true',
+                       help='Append every raw API page to a compressed per-repository archive')
+    parser.add_argument('--replay', action='store_true',
+                       help='Analyze commits from the archive instead of the GitHub API')
+    parser.add_argument('--archive-dir', type=str, default=DEFAULT_ARCHIVE_DIR,
+                       help=f'Directory of the response archive (default: {DEFAULT_ARCHIVE_DIR})')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='Score fetched pages while the next pages are still downloading')
+    parser.add_argument('--stream', action='store_true',
+                       help='Analyze commits page by page and print only the summary, '
+                            'keeping memory use independent of the number of commits')
+    parser.add_argument('--score-db', type=str, nargs='?', const=DEFAULT_SCORE_DB,
+                       help=f'SQLite database of scores from earlier runs; commits already scored '
+                            f'by this analyzer version are not rescored (default file: {DEFAULT_SCORE_DB})')
+    parser.add_argument('--score-workers', type=int, default=1,
+                       help='Processes used to score large batches of commits (default: 1)')
+    parser.add_argument('--vectorized', action='store_true',
+                       help='Score batches with the NumPy lexicon engine instead of running '
+                            'VADER on one message at a time')
+    parser.add_argument('--raw-messages', action='store_true',
+                       help='Score commit messages as they are, without stripping trailers, '
+                            'boilerplate, URLs and code first')
+    parser.add_argument('--max-message-length', type=int, default=DEFAULT_MAX_LENGTH,
+                       help=f'Characters of each cleaned message that are scored, 0 for all '
+                            f'(default: {DEFAULT_MAX_LENGTH})')
+    parser.add_argument('--results-file', type=str,
+                       help='CSV file holding results from previous runs; only commits newer '
+                            'than the stored ones are fetched and analyzed, then merged in')
     
     args = parser.parse_args()
     
+    local_source = LocalGitCommitSource.is_git_repository(args.owner)
+    
     # Handle case where repo might be in owner (owner/repo format)
-    if '/' in args.owner:
+    if local_source:
+        owner, repo = args.owner, args.repo or 'HEAD'
+    elif '/' in args.owner:
         parts = args.owner.split('/')
         owner = parts[0]
         repo = parts[1] if len(parts) > 1 else args.repo
@@ -65,21 +144,126 @@ Examples:
         print("   or: python main.py owner/repo")
         sys.exit(1)
     
+    if args.shards > 1 and not args.since:
+        print("Error: --shards needs the start of the time range in --since.")
+        sys.exit(1)
+    
+    # Filters are sent with every request, so only matching commits are downloaded
+    try:
+        filters = CommitFilters(author=args.author, path=args.path, since=args.since, until=args.until)
+    except ValueError as e:
+        print(f"Error: Invalid date: {e}")
+        sys.exit(1)
+    
+    # Local clones and the replay archive are read without the GitHub API
+    offline_source = local_source or args.replay
+    
     # Initialize components
-    fetcher = CommitFetcher(owner, repo)
-    analyzer = SentimentAnalyzer()
+    cache = None if args.no_cache or offline_source else ResponseCache(args.cache_dir)
+    if local_source:
+        fetcher = LocalGitCommitSource(owner, ref=repo, filters=filters)
+    elif args.replay:
+        if filters:
+            print("Warning: --author, --path, --since and --until are ignored with --replay")
+        fetcher = ArchiveCommitSource(owner, repo, ResponseArchive(args.archive_dir))
+    else:
+        archive = ResponseArchive(args.archive_dir) if args.archive else None
+        fetcher = CommitFetcher(owner, repo, cache=cache, archive=archive, filters=filters)
+    store = ScoreStore(args.score_db) if args.score_db else None
+    normalizer = None if args.raw_messages else MessageNormalizer(max_length=args.max_message_length or None)
+    analyzer = SentimentAnalyzer(store=store, workers=args.score_workers, vectorized=args.vectorized,
+                                 normalizer=normalizer, templates=True)
     visualizer = SentimentVisualizer()
     
-    # Fetch commits
-    commits = fetcher.fetch_commits(limit=args.limit)
+    limit = args.limit if args.limit > 0 else None
     
-    if not commits:
+    if args.stream:
+        print("Analyzing sentiment while streaming commits...")
+        summary = RunningSummary()
+        try:
+            for batch in analyzer.iter_results(fetcher.iter_commits(limit)):
+                summary.update(batch)
+        except (requests.exceptions.RequestException, RuntimeError, OSError) as e:
+            print(f"Error fetching commits: {e}")
+            if not summary.total:
+                sys.exit(1)
+            # Keep the batches that were analyzed before the failure
+            print(f"Keeping {summary.total} commits fetched before the error")
+        print_summary(summary.result())
+        print("✅ Analysis complete!")
+        return
+    
+    # Load results from the previous run and resume after its newest commit
+    previous = None
+    since_sha = None
+    if args.results_file and os.path.exists(args.results_file):
+        previous = load_results(args.results_file)
+        if len(previous) > 0:
+            since_sha = previous['sha'].iloc[0]
+            print(f"Loaded {len(previous)} stored results, newest commit {since_sha}")
+    
+    # Fetch commits, scoring them as they arrive in pipeline mode
+    df = None
+    if args.pipeline:
+        print(f"Fetching and analyzing commits from {owner if local_source else f'{owner}/{repo}'}...")
+        if offline_source:
+            pages = chunked(fetcher.iter_commits(limit, since_sha))
+        elif args.graphql:
+            pages = fetcher.iter_pages_graphql(limit, since_sha=since_sha)
+        else:
+            pages = fetcher.iter_pages(limit, since_sha=since_sha)
+        try:
+            commits, df, error = analyze_pipelined(pages, analyzer)
+        except (RuntimeError, OSError) as e:
+            print(f"Error analyzing commits: {e}")
+            commits, df, error = [], None, None
+        if error is not None:
+            print(f"Error fetching commits: {error}")
+            if commits:
+                # Keep the pages that were fetched and scored before the failure
+                print(f"Keeping {len(commits)} commits fetched before the error")
+    elif offline_source:
+        commits = fetcher.fetch_commits(limit=limit, since_sha=since_sha)
+    elif args.shards > 1:
+        commits = fetcher.fetch_commits_sharded(args.since, args.until, shards=args.shards,
+                                                max_workers=args.workers, limit=limit)
+    else:
+        commits = fetcher.fetch_commits(limit=limit, concurrent=args.concurrent,
+                                        max_workers=args.workers, since_sha=since_sha,
+                                        graphql=args.graphql)
+    
+    if not commits and previous is None:
         print("No commits found or error occurred.")
         sys.exit(1)
     
+    if cache and cache.hits:
+        print(f"Served {cache.hits} unchanged page(s) from cache")
+    
+    if not offline_source and fetcher.scheduler.remaining is not None:
+        print(f"GitHub API requests remaining: {fetcher.scheduler.remaining}")
+    
     # Analyze sentiment
-    print("Analyzing sentiment...")
-    df = analyzer.analyze_commits(commits)
+    if df is None:
+        print("Analyzing sentiment...")
+        df = analyzer.analyze_commits(commits)
+    
+    if normalizer and normalizer.characters_in:
+        print(f"Scored {normalizer.characters_out} of {normalizer.characters_in} message characters "
+              f"after stripping trailers, boilerplate, URLs and code")
+    if analyzer.cache.hits:
+        print(f"Scored {analyzer.cache.hits} repeated message(s) from the score cache")
+    if analyzer.templates.masked:
+        print(f"Reduced {analyzer.templates.masked} message(s) to shared templates "
+              f"(numbers, SHAs, versions, branches and users masked)")
+    if store and store.hits:
+        print(f"Reused {store.hits} stored score(s) from {store.path}")
+    
+    if args.results_file:
+        print(f"Analyzed {len(df)} new commit(s)")
+        df = analyzer.merge_results(previous, df)
+        df.to_csv(args.results_file, index=False)
+        print(f"Saved {len(df)} results to {args.results_file}")
+        commits = df[['sha', 'message', 'date', 'author']].to_dict('records')
     
     # Get summary
     summary = analyzer.get_summary(df)
@@ -0,0 +1,226 @@
+"""
+Message Normalizer
+Strips trailers, boilerplate, URLs and pasted code from commit messages before
+they are scored, caps the length of the scored text, and reduces templated
+messages to their template.
+"""
+
+import re
+import string
+from typing import AbstractSet, List, Optional
+
+
+DEFAULT_MAX_LENGTH = 1000
+
+# Bump whenever a pattern changes, so scores stored for normalized text are recomputed
+NORMALIZER_REVISION = 2
+
+# Only this many times max_length characters are scanned, so huge messages cost the same as long ones
+_SCAN_FACTOR = 8
+
+# Trailers whose value never carries sentiment; "Fixes:" only when it names a commit
+_TRAILERS = re.compile(
+    r'^[ \t]*(?:[\w-]+-by|Reviewed-on|Change-Id|Cc|git-svn-id)[ \t]*:.*$'
+    r'|^[ \t]*Fixes:[ \t]*[0-9a-f]{7,64}\b.*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+_BOILERPLATE = re.compile(
+    r'^This reverts commit [0-9a-f]{7,64}\.?[ \t]*$'
+    r'|^\(cherry picked from commit [0-9a-f]{7,64}\)[ \t]*$'
+    r'|^Conflicts:[ \t]*(?:\n[ \t]+.*)*'
+    r'|\[(?:skip ci|ci skip|no ci|skip actions|actions skip)\]',
+    re.IGNORECASE | re.MULTILINE
+)
+
+_URLS = re.compile(r'\b(?:https?|ftp)://\S+|\bwww\.\S+', re.IGNORECASE)
+
+# Fenced blocks, pasted diff hunks, stack traces, quoted replies and inline code
+_CODE = re.compile(
+    r'```(?s:.*?)(?:```|\Z)'
+    r'|^(?:diff --git |--- a/|\+\+\+ b/|@@ -\d).*'
+    r'(?:\n(?:[ +\-@\\]|index |diff |new file|deleted file|similarity|rename ).*)*'
+    r'|^Traceback \(most recent call last\):.*(?:\n[ \t].*)*(?:\n[\w.]+(?:Error|Exception)\b.*)?'
+    r'|^[ \t]+at [\w$.<>/]+\(.*\)[ \t]*$'
+    r'|^[ \t]*>.*$'
+    r'|`[^`\n]*`',
+    re.MULTILINE
+)
+
+# Variable parts of templated messages ("Bump lodash from 4.17.20 to 4.17.21",
+# "Merge pull request #12345 from user/branch") and the placeholders replacing them
+_TEMPLATE_PARTS = re.compile(
+    r'(?P<sha>\b(?=[a-f]*\d)(?=\d*[a-f])[0-9a-f]{7,64}\b)'
+    r'|(?P<version>\bv?\d+(?:\.\d+)+(?:-[0-9A-Za-z.]+)?\b)'
+    r'|(?P<ref>(?<![\w.-])[\w.-]+/[\w./-]*\w)'
+    r'|(?P<user>(?<![\w@])@[\w-]+)'
+    r'|(?P<number>\d+)'
+)
+_PLACEHOLDERS = {'sha': 'sha', 'version': 'ver', 'ref': 'ref', 'user': '@user', 'number': 'num'}
+
+
+class MessageNormalizer:
+    """Reduces a commit message to the text worth scoring."""
+    
+    def __init__(self, strip_trailers: bool = True, strip_boilerplate: bool = True,
+                 strip_urls: bool = True, strip_code: bool = True,
+                 subject_only: bool = False, max_length: Optional[int] = DEFAULT_MAX_LENGTH):
+        """
+        Initialize the normalizer.
+        
+        Args:
+            strip_trailers: Remove Signed-off-by, Co-authored-by and similar trailer lines
+            strip_boilerplate: Remove revert and cherry-pick notes, conflict lists and CI skip markers
+            strip_urls: Remove URLs
+            strip_code: Remove fenced and inline code, pasted diffs, stack traces and quoted lines
+            subject_only: Keep only the first remaining line
+            max_length: Maximum number of characters kept (None for no limit)
+        """
+        self.strip_trailers = strip_trailers
+        self.strip_boilerplate = strip_boilerplate
+        self.strip_urls = strip_urls
+        self.strip_code = strip_code
+        self.subject_only = subject_only
+        self.max_length = max_length
+        self.characters_in = 0
+        self.characters_out = 0
+        
+        # Applied in order; code goes first so URLs and trailers inside it do not matter
+        self._patterns = [pattern for enabled, pattern in (
+            (strip_code, _CODE),
+            (strip_trailers, _TRAILERS),
+            (strip_boilerplate, _BOILERPLATE),
+            (strip_urls, _URLS),
+        ) if enabled]
+    
+    @property
+    def fingerprint(self) -> str:
+        """Short description of the configuration, part of the analyzer version."""
+        flags = ''.join(flag for enabled, flag in (
+            (self.strip_trailers, 't'),
+            (self.strip_boilerplate, 'b'),
+            (self.strip_urls, 'u'),
+            (self.strip_code, 'c'),
+            (self.subject_only, 's'),
+        ) if enabled)
+        return f"norm{NORMALIZER_REVISION}-{flags or 'none'}-{self.max_length or 'all'}"
+    
+    def normalize(self, message: str) -> str:
+        """
+        Normalize one commit message.
+        
+        Args:
+            message: Raw commit message
+        
+        Returns:
+            Text to score; the raw subject line if nothing but boilerplate was
+            left, since VADER scores empty text as neither neutral nor polar
+        """
+        self.characters_in += len(message)
+        if self.max_length:
+            message = message[:self.max_length * _SCAN_FACTOR]
+        
+        text = message
+        for pattern in self._patterns:
+            text = pattern.sub('', text)
+        
+        lines = [line.strip() for line in text.split('\n')]
+        lines = [line for line in lines if line]
+        if not lines:
+            lines = [line.strip() for line in message.split('\n') if line.strip()][:1]
+        text = lines[0] if self.subject_only and lines else '\n'.join(lines)
+        
+        if self.max_length and len(text) > self.max_length:
+            cut = text[:self.max_length]
+            # Do not leave half a word at the end
+            if not text[self.max_length].isspace() and not cut[-1].isspace():
+                cut = cut.rsplit(None, 1)[0]
+            text = cut.rstrip()
+        
+        self.characters_out += len(text)
+        return text
+    
+    def normalize_many(self, messages: List[str]) -> List[str]:
+        """
+        Normalize a batch of commit messages.
+        
+        Args:
+            messages: Raw commit messages
+        
+        Returns:
+            Texts to score, in order
+        """
+        return [self.normalize(message) for message in messages]
+
+
+class TemplateCanonicalizer:
+    """
+    Masks SHAs, versions, branches, user names and numbers in messages.
+    
+    Messages generated from one template then share a cache key, so the
+    template is scored once. A token is only masked when the scores cannot
+    change: neither it nor its masked form may be a protected word or contain
+    "n't", and masking must keep whether the token is in ALL CAPS.
+    """
+    
+    def __init__(self, protected: AbstractSet[str]):
+        """
+        Initialize the canonicalizer.
+        
+        Args:
+            protected: Lowercase words that affect scores (see lexicon_engine.protected_words)
+        """
+        self.protected = protected
+        self.masked = 0
+    
+    def _interchangeable(self, token: str, template: str) -> bool:
+        """Whether VADER scores a message the same with template in place of token."""
+        if token.isupper() != template.isupper():
+            return False
+        for candidate in (token, template):
+            # VADER strips punctuation from a token unless that leaves two characters or fewer
+            stripped = candidate.strip(string.punctuation)
+            word = (candidate if len(stripped) <= 2 else stripped).lower()
+            if word in self.protected or "n't" in word:
+                return False
+        return True
+    
+    def canonicalize(self, message: str) -> str:
+        """
+        Reduce a message to its template.
+        
+        Args:
+            message: Commit message (or normalized text)
+        
+        Returns:
+            Message with its variable parts masked, or the message itself if
+            it has none
+        """
+        if _TEMPLATE_PARTS.search(message) is None:
+            return message
+        
+        tokens = message.split()
+        changed = False
+        for i, token in enumerate(tokens):
+            template = _TEMPLATE_PARTS.sub(lambda match: _PLACEHOLDERS[match.lastgroup], token)
+            if template != token and self._interchangeable(token, template):
+                tokens[i] = template
+                changed = True
+        
+        if not changed:
+            return message
+        self.masked += 1
+        # VADER splits on whitespace, so single spaces score the same as the original layout
+        return ' '.join(tokens)
+    
+    def canonicalize_many(self, messages: List[str]) -> List[str]:
+        """
+        Reduce a batch of messages to their templates.
+        
+        Args:
+            messages: Commit messages
+        
+        Returns:
+            Templates, in order
+        """
+        return [self.canonicalize(message) for message in messages]
@@ -0,0 +1,135 @@
+"""
+Organization Crawler
+Lists the repositories of a GitHub organization and analyzes them through a
+bounded worker pool that shares one rate-limit budget.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from commit_analyzer import CommitFetcher
+from rate_limit import RateLimitScheduler, get_shared_scheduler
+
+
+DEFAULT_CRAWL_WORKERS = 4
+PRIORITIES = ('activity', 'size')
+
+
+class OrgCrawler:
+    """Queues an organization's repositories by priority and analyzes them in parallel."""
+    
+    def __init__(self, org: str, session: Optional[requests.Session] = None,
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 api_url: Optional[str] = None,
+                 max_workers: int = DEFAULT_CRAWL_WORKERS):
+        """
+        Initialize the crawler.
+        
+        Args:
+            org: GitHub organization (or user) whose repositories are crawled
+            session: Session to send requests with (defaults to a shared pooled session)
+            scheduler: Token pool shared by the listing and every repository
+                (defaults to the shared pool)
+            api_url: Root URL of the GitHub API (defaults to GITHUB_API_URL)
+            max_workers: Maximum number of repositories analyzed at the same time
+        """
+        self.org = org
+        self.scheduler = scheduler or get_shared_scheduler()
+        self.max_workers = max_workers
+        # Listing requests go through a fetcher to share its retries, breaker and tokens
+        self._client = CommitFetcher(org, '', session=session, scheduler=self.scheduler,
+                                     api_url=api_url)
+        self.session = self._client.session
+        self.api_url = self._client.api_url
+    
+    def list_repositories(self, include_forks: bool = False) -> List[Dict]:
+        """
+        List the organization's repositories that have commits to analyze.
+        
+        Archived and empty repositories are skipped. Falls back to the user
+        endpoint when the owner is not an organization.
+        
+        Args:
+            include_forks: Also list repositories that are forks
+        
+        Returns:
+            List of dictionaries with owner, repo, pushed_at and size
+        """
+        url = f"{self.api_url}/orgs/{self.org}/repos"
+        repositories = []
+        page = 1
+        
+        while True:
+            response = self._client._request('GET', url, params={'type': 'all', 'per_page': 100, 'page': page})
+            if response.status_code == 404 and page == 1 and '/orgs/' in url:
+                url = f"{self.api_url}/users/{self.org}/repos"
+                continue
+            response.raise_for_status()
+            data = response.json()
+            
+            for item in data:
+                if item.get('archived') or not item.get('size'):
+                    continue
+                if item.get('fork') and not include_forks:
+                    continue
+                repositories.append({
+                    'owner': item['owner']['login'],
+                    'repo': item['name'],
+                    'pushed_at': item.get('pushed_at') or '',
+                    'size': item['size'],
+                })
+            
+            if len(data) < 100:
+                return repositories
+            page += 1
+    
+    @staticmethod
+    def prioritize(repositories: List[Dict], by: str = 'activity') -> List[Dict]:
+        """
+        Order repositories so the most relevant ones are crawled first.
+        
+        Args:
+            repositories: Repositories from list_repositories
+            by: 'activity' for the most recently pushed first, 'size' for the largest first
+        
+        Returns:
+            New list in crawl order
+        """
+        if by not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{by}', expected one of {', '.join(PRIORITIES)}")
+        key = 'pushed_at' if by == 'activity' else 'size'
+        return sorted(repositories, key=lambda repository: repository[key], reverse=True)
+    
+    def crawl(self, analyze: Callable[[str, str], Optional[Dict]], by: str = 'activity',
+              max_repos: Optional[int] = None, include_forks: bool = False) -> List[Dict]:
+        """
+        Analyze the organization's repositories in priority order.
+        
+        Repositories are queued in priority order and taken from the queue by
+        at most max_workers threads, so the shared token pool stays busy
+        without opening a connection per repository.
+        
+        Args:
+            analyze: Called with (owner, repo); returns a result or None
+            by: Priority used to order the queue ('activity' or 'size')
+            max_repos: Only crawl this many repositories (None for all)
+            include_forks: Also crawl repositories that are forks
+        
+        Returns:
+            Non-empty results, in priority order
+        """
+        print(f"Listing repositories of {self.org}...")
+        repositories = self.prioritize(self.list_repositories(include_forks), by)
+        if max_repos is not None:
+            repositories = repositories[:max_repos]
+        print(f"Crawling {len(repositories)} repositories with {self.max_workers} workers")
+        
+        # The executor's work queue is FIFO, so submission order is crawl order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(analyze, repository['owner'], repository['repo'])
+                       for repository in repositories]
+            results = [future.result() for future in futures]
+        
+        return [result for result in results if result]
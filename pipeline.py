@@ -0,0 +1,108 @@
+"""
+Fetch/Score Pipeline
+Overlaps fetching commit pages with sentiment scoring using a bounded queue.
+"""
+
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from sentiment_analyzer import SentimentAnalyzer
+
+
+DEFAULT_QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+def chunked(commits: Iterable[Dict], size: int = 100) -> Iterator[List[Dict]]:
+    """
+    Group a stream of commits into pages.
+    
+    Args:
+        commits: Iterable of commit dictionaries
+        size: Number of commits per page
+        
+    Yields:
+        Lists of at most size commits
+    """
+    page = []
+    for commit in commits:
+        page.append(commit)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def analyze_pipelined(pages: Iterable[List[Dict]], analyzer: SentimentAnalyzer,
+                      queue_size: int = DEFAULT_QUEUE_SIZE
+                      ) -> Tuple[List[Dict], pd.DataFrame, Optional[Exception]]:
+    """
+    Fetch and score commits at the same time.
+    
+    A background thread pulls pages from the source (e.g. CommitFetcher.iter_pages)
+    into a bounded queue while the calling thread scores the pages already
+    received. Network waits and scoring overlap, so the total time approaches
+    the slower of the two stages instead of their sum. The queue bound keeps a
+    fast fetcher from running arbitrarily far ahead of scoring.
+    
+    A fetch error ends the run without discarding the pages that were already
+    scored; the error is returned with them. Scoring errors are raised.
+    
+    Args:
+        pages: Iterable of commit pages; it is consumed on a background thread
+        analyzer: Sentiment analyzer used to score each page
+        queue_size: Maximum number of fetched pages waiting to be scored
+        
+    Returns:
+        Tuple of (commits received, DataFrame with their sentiment scores,
+        the error that stopped fetching or None)
+    """
+    pending: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        """Queue an item, giving up promptly if the consumer failed instead of blocking forever."""
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+            put(_DONE)
+        except Exception as e:
+            put(e)
+    
+    producer = threading.Thread(target=produce, name='commit-fetcher', daemon=True)
+    producer.start()
+    
+    commits = []
+    frames = []
+    error = None
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                error = item
+                break
+            commits.extend(item)
+            frames.append(analyzer.analyze_commits(item))
+    finally:
+        stop.set()
+        producer.join()
+    
+    df = pd.concat(frames, ignore_index=True) if frames else analyzer.analyze_commits([])
+    return commits, df, error
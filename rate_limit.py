@@ -0,0 +1,184 @@
+"""
+Rate Limit Scheduler
+Spreads GitHub API requests across a pool of tokens using the rate-limit headers.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+# Wait used for secondary rate limits that carry neither Retry-After nor a reset time
+DEFAULT_BACKOFF = 60
+
+
+class TokenBudget:
+    """Remaining request budget of a single token, as reported by GitHub."""
+    
+    def __init__(self, token: Optional[str]):
+        """
+        Initialize the budget.
+        
+        Args:
+            token: GitHub access token (None for unauthenticated requests)
+        """
+        self.token = token
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: float = 0.0
+    
+    def refresh(self, now: float):
+        """Forget the exhausted budget once its reset time has passed."""
+        if self.remaining == 0 and now >= self.reset:
+            self.remaining = None
+    
+    def available(self) -> bool:
+        """Whether the token may be used for another request."""
+        return self.remaining is None or self.remaining > 0
+
+
+class RateLimitScheduler:
+    """Chooses a token for each request and waits only until the real reset time."""
+    
+    def __init__(self, tokens: Optional[List[Optional[str]]] = None,
+                 sleep: Callable[[float], None] = time.sleep,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            tokens: Access tokens to spread requests across (empty for unauthenticated)
+            sleep: Function used to wait (replaceable for tests)
+            clock: Function returning the current Unix time
+        """
+        self.budgets = [TokenBudget(token) for token in (tokens or [None])]
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls) -> 'RateLimitScheduler':
+        """
+        Create a scheduler from GITHUB_TOKENS (comma-separated) or GITHUB_TOKEN.
+        
+        Returns:
+            Scheduler over the configured tokens
+        """
+        tokens = [t.strip() for t in os.environ.get('GITHUB_TOKENS', '').split(',') if t.strip()]
+        if not tokens and os.environ.get('GITHUB_TOKEN'):
+            tokens = [os.environ['GITHUB_TOKEN']]
+        return cls(tokens)
+    
+    @property
+    def remaining(self) -> Optional[int]:
+        """Total requests left across all tokens, or None before any response was seen."""
+        known = [b.remaining for b in self.budgets if b.remaining is not None]
+        return sum(known) if known else None
+    
+    def quota(self) -> List[Dict]:
+        """
+        Report the known budget of every token.
+        
+        Returns:
+            One dictionary per token with limit, remaining and reset (Unix time)
+        """
+        return [
+            {'limit': b.limit, 'remaining': b.remaining, 'reset': b.reset}
+            for b in self.budgets
+        ]
+    
+    def acquire(self) -> Optional[str]:
+        """
+        Pick the token with the most budget left, waiting if every token is exhausted.
+        
+        Returns:
+            Token to send with the next request (None when unauthenticated)
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                for budget in self.budgets:
+                    budget.refresh(now)
+                available = [b for b in self.budgets if b.available()]
+                if available:
+                    # Unknown budgets are tried first so every token reports its quota
+                    budget = max(available, key=lambda b: float('inf') if b.remaining is None else b.remaining)
+                    if budget.remaining:
+                        budget.remaining -= 1
+                    return budget.token
+                wait = min(b.reset for b in self.budgets) - now
+            
+            wait = max(wait, 0) + 1
+            print(f"Rate limit exhausted for all tokens. Waiting {wait:.0f} seconds until reset...")
+            self._sleep(wait)
+    
+    def update(self, token: Optional[str], response: requests.Response):
+        """
+        Record the budget reported in a response's rate-limit headers.
+        
+        Args:
+            token: Token the request was sent with
+            response: Response received for the request
+        """
+        headers = response.headers
+        with self._lock:
+            budget = self._budget(token)
+            if 'X-RateLimit-Remaining' in headers:
+                budget.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Limit' in headers:
+                budget.limit = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Reset' in headers:
+                budget.reset = float(headers['X-RateLimit-Reset'])
+            
+            if self.is_rate_limited(response):
+                budget.remaining = 0
+                if 'Retry-After' in headers:
+                    budget.reset = self._clock() + float(headers['Retry-After'])
+                elif budget.reset <= self._clock():
+                    budget.reset = self._clock() + DEFAULT_BACKOFF
+    
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        """
+        Check whether a response was rejected because of a rate limit.
+        
+        Args:
+            response: Response received from the API
+            
+        Returns:
+            True for primary (remaining quota 0) and secondary rate-limit rejections
+        """
+        if response.status_code not in (403, 429):
+            return False
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return True
+        return response.status_code == 429 or 'rate limit' in response.text.lower()
+    
+    def _budget(self, token: Optional[str]) -> TokenBudget:
+        for budget in self.budgets:
+            if budget.token == token:
+                return budget
+        raise KeyError("Token is not part of this scheduler")
+
+
+_shared_scheduler: Optional[RateLimitScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_shared_scheduler() -> RateLimitScheduler:
+    """
+    Return the process-wide scheduler built from the environment.
+    
+    Sharing one scheduler lets every fetcher draw from the same token budget.
+    
+    Returns:
+        Shared RateLimitScheduler
+    """
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = RateLimitScheduler.from_env()
+        return _shared_scheduler
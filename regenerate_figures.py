@@ -2,6 +2,7 @@
 Regenerate visualizations from the 200-commit analysis
 """
 from commit_analyzer import CommitFetcher
+from http_cache import ResponseCache
 from sentiment_analyzer import SentimentAnalyzer
 from visualizer import SentimentVisualizer
 
@@ -11,7 +12,7 @@ print("="*70)
 
 # Fetch 200 commits
 print("\n[1/3] Fetching 200 commits...")
-fetcher = CommitFetcher('microsoft', 'vscode')
+fetcher = CommitFetcher('microsoft', 'vscode', cache=ResponseCache())
 commits = fetcher.fetch_commits(limit=200)
 print(f"    ✓ Fetched {len(commits)} commits")
 
@@ -0,0 +1,153 @@
+"""
+Request Resilience
+Retry with exponential backoff and jitter, plus a per-host circuit breaker.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict
+
+import requests
+
+
+# Server-side failures that are worth retrying
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+# Network-level failures that are worth retrying
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+    
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the retry policy.
+        
+        Args:
+            max_retries: Retries after the first attempt before giving up
+            base_delay: Upper bound of the first backoff in seconds
+            max_delay: Cap on the backoff in seconds
+            sleep: Function used to wait (replaceable for tests)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+    
+    def backoff(self, attempt: int) -> float:
+        """
+        Pick the wait before a retry.
+        
+        Args:
+            attempt: Number of retries already made (0 for the first retry)
+            
+        Returns:
+            Random delay between 0 and the exponential bound, in seconds
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def wait(self, attempt: int):
+        """Sleep for the backoff of the given retry attempt."""
+        self._sleep(self.backoff(attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host after repeated failures.
+    
+    After failure_threshold consecutive failures the circuit opens and requests
+    fail immediately. Once reset_timeout has passed, one trial request is let
+    through (half-open). The circuit closes again if that request succeeds.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the circuit breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to wait before allowing a trial request
+            clock: Function returning the current time in seconds
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._clock = clock
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """Current state: 'closed', 'open' or 'half-open'."""
+        if self.opened_at is None:
+            return 'closed'
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+    
+    def before_request(self, host: str = ''):
+        """
+        Check that a request may be sent.
+        
+        Args:
+            host: Host name used in the error message
+            
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise CircuitOpenError(f"Circuit open for {host or 'host'} after {self.failures} consecutive failures")
+    
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        """Count a failed request, opening the circuit at the threshold."""
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker for a host.
+    
+    Args:
+        host: Host name (and port) requests are sent to
+        
+    Returns:
+        CircuitBreaker shared by every fetcher talking to the host
+    """
+    with _circuit_breakers_lock:
+        if host not in _circuit_breakers:
+            _circuit_breakers[host] = CircuitBreaker()
+        return _circuit_breakers[host]
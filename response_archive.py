@@ -0,0 +1,174 @@
+"""
+Response Archive
+Appends raw GitHub API pages to compressed JSONL files and replays them offline.
+"""
+
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+
+DEFAULT_ARCHIVE_DIR = 'archive'
+
+
+class ResponseArchive:
+    """Append-only, gzip-compressed JSONL archive of raw API pages, one file per repository."""
+    
+    def __init__(self, directory: str = DEFAULT_ARCHIVE_DIR):
+        """
+        Initialize the archive.
+        
+        Args:
+            directory: Directory the archive files are written to
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def path_for(self, owner: str, repo: str) -> str:
+        """
+        Return the archive file of a repository.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            
+        Returns:
+            Path of the repository's .jsonl.gz file
+        """
+        return os.path.join(self.directory, f"{owner}__{repo}.jsonl.gz")
+    
+    def append(self, owner: str, repo: str, kind: str, url: str, params: Optional[Dict], data):
+        """
+        Append one raw page to the repository's archive.
+        
+        Each call writes a separate gzip member, which gzip readers treat as
+        one continuous stream, so existing data is never rewritten.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            kind: 'rest' for /commits pages, 'graphql' for history connections
+            url: Request URL
+            params: Query parameters or GraphQL variables
+            data: Decoded response payload
+        """
+        record = {
+            'fetched_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'kind': kind,
+            'url': url,
+            'params': params,
+            'data': data,
+        }
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            with gzip.open(self.path_for(owner, repo), 'at', encoding='utf-8') as f:
+                f.write(line)
+
+
+class ArchiveCommitSource:
+    """Replays commits from a ResponseArchive without touching the network."""
+    
+    def __init__(self, owner: str, repo: str, archive: Optional[ResponseArchive] = None):
+        """
+        Initialize the replay source.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            archive: Archive to read from (defaults to DEFAULT_ARCHIVE_DIR)
+        """
+        self.owner = owner
+        self.repo = repo
+        self.archive = archive or ResponseArchive()
+        self.path = self.archive.path_for(owner, repo)
+    
+    def load_commits(self) -> List[Dict]:
+        """
+        Merge the commits of every archived crawl, newest first.
+        
+        Crawls are appended one after another, so archive order puts older
+        crawls first. Commits are deduplicated on their full SHA, keeping the
+        most recently archived record, and sorted by date like the API does.
+        
+        Returns:
+            List of commit dictionaries with sha, message, date and author
+        """
+        # Imported here to avoid a cycle: commit_analyzer writes to this module's archive
+        from commit_analyzer import CommitFetcher, _parse_timestamp
+        
+        merged: Dict[str, Dict] = {}
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['kind'] == 'graphql':
+                    raw = [(node['oid'], CommitFetcher._parse_history_node(node))
+                           for node in record['data']['nodes']]
+                else:
+                    raw = [(commit['sha'], CommitFetcher._parse_commit(commit))
+                           for commit in record['data']]
+                merged.update(raw)
+        
+        # Stable, so commits with the same date keep their archive order
+        return sorted(merged.values(), key=lambda commit: _parse_timestamp(commit['date']), reverse=True)
+    
+    def iter_pages(self, page_size: int = 100) -> Iterator[List[Dict]]:
+        """
+        Yield the merged archived commits in pages, newest first.
+        
+        Args:
+            page_size: Number of commits per page
+            
+        Yields:
+            Lists of commit dictionaries with sha, message, date and author
+        """
+        commits = self.load_commits()
+        for start in range(0, len(commits), page_size):
+            yield commits[start:start + page_size]
+    
+    def iter_commits(self, limit: Optional[int] = None,
+                     since_sha: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Yield archived commits one at a time.
+        
+        Args:
+            limit: Maximum number of commits to yield (None for all)
+            since_sha: Stop before this commit (full or abbreviated SHA)
+            
+        Yields:
+            Commit dictionaries with sha, message, date and author
+        """
+        count = 0
+        for page in self.iter_pages():
+            for commit in page:
+                if limit is not None and count >= limit:
+                    return
+                if since_sha and (commit['sha'].startswith(since_sha) or since_sha.startswith(commit['sha'])):
+                    return
+                yield commit
+                count += 1
+    
+    def fetch_commits(self, limit: Optional[int] = 200, since_sha: Optional[str] = None) -> List[Dict]:
+        """
+        Load archived commits into a list, mirroring CommitFetcher.fetch_commits.
+        
+        Args:
+            limit: Maximum number of commits to return (None for all)
+            since_sha: Stop before this commit (full or abbreviated SHA)
+            
+        Returns:
+            List of commit dictionaries, empty if the archive could not be read
+        """
+        print(f"Replaying commits from {self.path}...")
+        
+        try:
+            commits = list(self.iter_commits(limit, since_sha))
+        except (OSError, ValueError) as e:
+            print(f"Error reading archive: {e}")
+            return []
+        
+        print(f"Found {len(commits)} commits")
+        return commits
@@ -0,0 +1,98 @@
+"""
+Score Store
+Persists sentiment scores in SQLite so commits are only scored once per analyzer version.
+"""
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, Tuple
+
+
+DEFAULT_SCORE_DB = 'scores.db'
+
+# Stay well below SQLite's limit on the number of bound parameters
+_LOOKUP_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    sha TEXT NOT NULL,
+    version TEXT NOT NULL,
+    compound REAL NOT NULL,
+    positive REAL NOT NULL,
+    neutral REAL NOT NULL,
+    negative REAL NOT NULL,
+    sentiment TEXT NOT NULL,
+    PRIMARY KEY (sha, version)
+) WITHOUT ROWID
+"""
+
+
+class ScoreStore:
+    """SQLite table of sentiment scores keyed by (full commit SHA, analyzer version)."""
+    
+    def __init__(self, path: str = DEFAULT_SCORE_DB):
+        """
+        Open (and create if needed) the score database.
+        
+        Args:
+            path: Path of the SQLite database file (':memory:' for a temporary store)
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # The analyzer may run on a pipeline thread, so access is serialized by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+    
+    def lookup(self, shas: Iterable[str], version: str) -> Dict[str, Tuple[float, float, float, float]]:
+        """
+        Fetch the stored scores of many commits with batched primary-key queries.
+        
+        Args:
+            shas: Commit SHAs to look up
+            version: Analyzer version the scores must have been computed with
+        
+        Returns:
+            Dictionary mapping each stored SHA to its
+            (compound, positive, neutral, negative) scores
+        """
+        shas = list(dict.fromkeys(shas))
+        found = {}
+        with self._lock:
+            for start in range(0, len(shas), _LOOKUP_BATCH_SIZE):
+                batch = shas[start:start + _LOOKUP_BATCH_SIZE]
+                placeholders = ', '.join('?' * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT sha, compound, positive, neutral, negative FROM scores "
+                    f"WHERE version = ? AND sha IN ({placeholders})",
+                    [version, *batch]
+                )
+                for sha, *scores in rows:
+                    found[sha] = tuple(scores)
+            self.hits += len(found)
+            self.misses += len(shas) - len(found)
+        return found
+    
+    def save(self, scores: Iterable[Tuple[str, float, float, float, float, str]], version: str):
+        """
+        Store the scores of newly analyzed commits in one transaction.
+        
+        Args:
+            scores: (sha, compound, positive, neutral, negative, sentiment) rows
+            version: Analyzer version the scores were computed with
+        """
+        rows = [(sha, version, *values) for sha, *values in scores]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO scores "
+                "(sha, version, compound, positive, neutral, negative, sentiment) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
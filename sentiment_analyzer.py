@@ -3,18 +3,230 @@ Sentiment Analysis Module
 Analyzes commit messages using VaderSentiment.
 """
 
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict, List
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import math
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from compiled_lexicon import get_shared_vader, vader_version
+from lexicon_engine import LexiconEngine, protected_words
+from message_normalizer import MessageNormalizer, TemplateCanonicalizer
+from score_store import ScoreStore
+
+
+DEFAULT_SCORE_CACHE_SIZE = 10000
+
+# Below this many distinct unscored messages, starting work in the pool costs more than it saves
+PARALLEL_MIN_MESSAGES = 2000
+# Chunks per worker, so a slow chunk does not leave the other workers idle
+_CHUNKS_PER_WORKER = 4
+
+# Bump whenever the scoring or classification changes, so stored scores are recomputed
+SCORING_REVISION = 1
+
+ANALYZER_VERSION = f"vader-{vader_version()}+r{SCORING_REVISION}"
+
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Sentiment codes are -1, 0 and 1, so code + 1 indexes the label
+SENTIMENT_LABELS = np.array(['negative', 'neutral', 'positive'], dtype=object)
+
+
+def classify(compound: np.ndarray) -> np.ndarray:
+    """
+    Classify compound scores into int8 sentiment codes.
+    
+    Args:
+        compound: Array of compound scores
+        
+    Returns:
+        Array of codes: -1 negative, 0 neutral, 1 positive
+    """
+    codes = np.zeros(len(compound), dtype=np.int8)
+    codes[compound >= POSITIVE_THRESHOLD] = 1
+    codes[compound <= NEGATIVE_THRESHOLD] = -1
+    return codes
+
+
+class ScoreArrays(NamedTuple):
+    """Scores of a batch of messages, one contiguous array per score."""
+    
+    compound: np.ndarray
+    positive: np.ndarray
+    neutral: np.ndarray
+    negative: np.ndarray
+    sentiment: np.ndarray
+    
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'ScoreArrays':
+        """Build from a (4, n) array of compound, positive, neutral and negative rows."""
+        return cls(values[0], values[1], values[2], values[3], classify(values[0]))
+    
+    def labels(self) -> np.ndarray:
+        """Sentiment labels ('positive', 'neutral', 'negative') for the codes."""
+        return SENTIMENT_LABELS[self.sentiment + 1]
+
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    """Load the compiled VADER lexicon once per worker process."""
+    global _worker_analyzer
+    _worker_analyzer = get_shared_vader()
+
+
+def _score_chunk(messages: List[str]) -> np.ndarray:
+    """Score a chunk of messages in a worker, returning a (4, n) array of scores."""
+    values = np.empty((4, len(messages)))
+    for i, message in enumerate(messages):
+        polarity = _worker_analyzer.polarity_scores(message)
+        values[:, i] = (polarity['compound'], polarity['pos'], polarity['neu'], polarity['neg'])
+    return values
+
+
+class ScoreCache:
+    """Least-recently-used cache of sentiment scores keyed by normalized message."""
+    
+    def __init__(self, capacity: int = DEFAULT_SCORE_CACHE_SIZE):
+        """
+        Initialize the cache.
+        
+        Args:
+            capacity: Maximum number of messages kept; the least recently
+                used one is evicted when it is full (0 disables caching)
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def make_key(message: str) -> str:
+        """
+        Normalize a message into a cache key.
+        
+        VADER splits messages on whitespace, so messages that only differ in
+        spacing or line breaks get the same scores. Case and punctuation are
+        kept because VADER scores them.
+        """
+        return ' '.join(message.split())
+    
+    def get(self, key: str) -> Optional[Tuple[float, float, float, float]]:
+        """Return a key's cached (compound, positive, neutral, negative) and mark it as recently used."""
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return scores
+    
+    def put(self, key: str, scores: Tuple[float, float, float, float]):
+        """Store (compound, positive, neutral, negative), evicting the least recently used entry when full."""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = scores
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+class RunningSummary:
+    """Accumulates summary statistics without keeping the analyzed rows."""
+    
+    def __init__(self):
+        """Initialize empty counters."""
+        self.counts = {'positive': 0, 'neutral': 0, 'negative': 0}
+        self.total = 0
+        self.compound_sum = 0.0
+    
+    def update(self, df: pd.DataFrame):
+        """
+        Add a batch of analyzed commits.
+        
+        Args:
+            df: DataFrame with sentiment analysis results
+        """
+        for sentiment, count in df['sentiment'].value_counts().items():
+            self.counts[sentiment] += int(count)
+        self.total += len(df)
+        self.compound_sum += float(df['compound'].sum())
+    
+    def result(self) -> Dict:
+        """
+        Build a summary with the same keys as SentimentAnalyzer.get_summary.
+        
+        Returns:
+            Dictionary with summary statistics
+        """
+        total = self.total
+        return {
+            'total_commits': total,
+            'positive_count': self.counts['positive'],
+            'neutral_count': self.counts['neutral'],
+            'negative_count': self.counts['negative'],
+            'average_compound': self.compound_sum / total if total > 0 else math.nan,
+            'positive_percentage': (self.counts['positive'] / total * 100) if total > 0 else 0,
+            'neutral_percentage': (self.counts['neutral'] / total * 100) if total > 0 else 0,
+            'negative_percentage': (self.counts['negative'] / total * 100) if total > 0 else 0,
+        }
+
 
 class SentimentAnalyzer:
     """Analyzes sentiment of text using VaderSentiment."""
     
-    def __init__(self):
-        """Initialize the sentiment analyzer."""
-        self.analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, cache_size: int = DEFAULT_SCORE_CACHE_SIZE,
+                 store: Optional[ScoreStore] = None, workers: int = 1,
+                 vectorized: bool = False, normalizer: Optional[MessageNormalizer] = None,
+                 templates: bool = False):
+        """
+        Initialize the sentiment analyzer.
+        
+        Args:
+            cache_size: Number of distinct messages whose scores are memoized
+                (0 disables the cache)
+            store: Optional SQLite store; analyze_commits reuses the scores it
+                holds for this analyzer version and saves new ones
+            workers: Number of processes used to score large batches (1 scores
+                everything in this process)
+            vectorized: Score batches with the NumPy lexicon engine instead of
+                calling VADER once per message (same scores, much faster)
+            normalizer: Optional preprocessing applied to every message before
+                it is scored; its configuration becomes part of the version
+            templates: Mask numbers, SHAs, versions, branches and user names
+                before the cache lookup, so messages built from one template
+                are scored once (the masking never changes the scores)
+        """
+        # VADER keeps no state between calls, so every analyzer shares one built from the compiled lexicon
+        self.analyzer = get_shared_vader()
+        self.cache = ScoreCache(cache_size)
+        self.store = store
+        self.normalizer = normalizer
+        self.version = ANALYZER_VERSION if normalizer is None else f"{ANALYZER_VERSION}+{normalizer.fingerprint}"
+        self.workers = workers
+        self.engine = LexiconEngine(analyzer=self.analyzer) if vectorized else None
+        self.templates = TemplateCanonicalizer(protected_words(self.analyzer.lexicon)) if templates else None
+        self._pool = None
     
     def analyze_message(self, message: str) -> Dict:
         """
@@ -26,55 +238,220 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment scores and classification
         """
-        scores = self.analyzer.polarity_scores(message)
+        if self.normalizer is not None:
+            message = self.normalizer.normalize(message)
+        if self.templates is not None:
+            message = self.templates.canonicalize(message)
+        compound, positive, neutral, negative = self._scores(message)
         
         # Classify as positive, negative, or neutral
-        compound = scores['compound']
-        if compound >= 0.05:
+        if compound >= POSITIVE_THRESHOLD:
             sentiment = 'positive'
-        elif compound <= -0.05:
+        elif compound <= NEGATIVE_THRESHOLD:
             sentiment = 'negative'
         else:
             sentiment = 'neutral'
         
         return {
             'compound': compound,
-            'positive': scores['pos'],
-            'neutral': scores['neu'],
-            'negative': scores['neg'],
+            'positive': positive,
+            'neutral': neutral,
+            'negative': negative,
             'sentiment': sentiment
         }
     
-    def analyze_commits(self, commits: List[Dict]) -> pd.DataFrame:
+    def analyze_messages(self, messages: Iterable[str]) -> ScoreArrays:
+        """
+        Analyze a batch of messages into score arrays.
+        
+        Scores are written straight into preallocated arrays, so no dictionary
+        is built per message.
+        
+        Args:
+            messages: Commit message texts
+            
+        Returns:
+            ScoreArrays with one entry per message, in order
+        """
+        messages = messages if isinstance(messages, list) else list(messages)
+        if self.normalizer is not None:
+            messages = self.normalizer.normalize_many(messages)
+        if self.templates is not None:
+            messages = self.templates.canonicalize_many(messages)
+        values = np.empty((4, len(messages)))
+        
+        if self.engine is not None or (self.workers > 1 and len(messages) >= PARALLEL_MIN_MESSAGES):
+            self._score_batch(messages, values)
+        else:
+            for i, message in enumerate(messages):
+                values[:, i] = self._scores(message)
+        return ScoreArrays.from_values(values)
+    
+    def _score_batch(self, messages: List[str], values: np.ndarray):
+        """Fill values with scores, sending the distinct uncached messages to the engine or pool."""
+        pending: Dict[str, List[int]] = {}
+        for i, message in enumerate(messages):
+            key = ScoreCache.make_key(message)
+            scores = self.cache.get(key)
+            if scores is not None:
+                values[:, i] = scores
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        keys = list(pending)
+        unique = [messages[pending[key][0]] for key in keys]
+        if self.engine is not None:
+            scored = self.engine.score(unique)
+        elif len(unique) >= PARALLEL_MIN_MESSAGES:
+            size = -(-len(unique) // (self.workers * _CHUNKS_PER_WORKER))
+            chunks = [unique[start:start + size] for start in range(0, len(unique), size)]
+            # Chunks come back in order as columns and are joined once
+            scored = np.concatenate(list(self._get_pool().map(_score_chunk, chunks)), axis=1)
+        else:
+            scored = np.array([self._polarity(message) for message in unique]).T
+        
+        for column, key in enumerate(keys):
+            scores = tuple(scored[:, column].tolist())
+            self.cache.put(key, scores)
+            values[:, pending[key]] = np.array(scores)[:, None]
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the worker pool on first use; the workers stay warm between batches."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+    
+    def close(self):
+        """Shut down the scoring worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def _scores(self, message: str) -> Tuple[float, float, float, float]:
+        """Return (compound, positive, neutral, negative) for a message, using the cache."""
+        # Repeated messages (merges, README updates, bot bumps) are scored once
+        key = ScoreCache.make_key(message)
+        scores = self.cache.get(key)
+        if scores is None:
+            scores = self._polarity(message)
+            self.cache.put(key, scores)
+        return scores
+    
+    def _polarity(self, message: str) -> Tuple[float, float, float, float]:
+        """Run VADER on a message."""
+        polarity = self.analyzer.polarity_scores(message)
+        return (polarity['compound'], polarity['pos'], polarity['neu'], polarity['neg'])
+    
+    def analyze_commits(self, commits: Iterable[Dict]) -> pd.DataFrame:
         """
         Analyze sentiment for a list of commits.
         
         Args:
-            commits: List of commit dictionaries
+            commits: List (or any iterable) of commit dictionaries
             
         Returns:
             DataFrame with commits and their sentiment scores
         """
-        results = []
+        commits = commits if isinstance(commits, list) else list(commits)
+        shas = [commit['sha'] for commit in commits]
+        messages = [commit['message'] for commit in commits]
+        
+        if self.store is None:
+            scores = self.analyze_messages(messages)
+        else:
+            scores = self._analyze_with_store(shas, messages)
+        
+        return pd.DataFrame({
+            'sha': shas,
+            'message': messages,
+            'date': pd.to_datetime([commit['date'] for commit in commits], utc=True, format='ISO8601'),
+            'author': [commit['author'] for commit in commits],
+            'compound': scores.compound,
+            'positive': scores.positive,
+            'neutral': scores.neutral,
+            'negative': scores.negative,
+            'sentiment': scores.labels()
+        })
+    
+    def _analyze_with_store(self, shas: List[str], messages: List[str]) -> ScoreArrays:
+        """Score only the commits the store has no scores for under this analyzer version."""
+        stored = self.store.lookup(shas, self.version)
+        missing = [i for i, sha in enumerate(shas) if sha not in stored]
+        
+        values = np.empty((4, len(shas)))
+        for i, sha in enumerate(shas):
+            if sha in stored:
+                values[:, i] = stored[sha]
+        
+        if missing:
+            new = self.analyze_messages([messages[i] for i in missing])
+            values[:, missing] = [new.compound, new.positive, new.neutral, new.negative]
+            self.store.save(zip([shas[i] for i in missing], new.compound.tolist(), new.positive.tolist(),
+                                new.neutral.tolist(), new.negative.tolist(), new.labels().tolist()),
+                            self.version)
+        
+        return ScoreArrays.from_values(values)
+    
+    def iter_results(self, commits: Iterable[Dict], batch_size: int = 100) -> Iterator[pd.DataFrame]:
+        """
+        Analyze a stream of commits in batches.
         
+        Only one batch of commits and results is held at a time, so this works
+        on histories far larger than memory (e.g. CommitFetcher.iter_commits).
+        
+        Args:
+            commits: Iterable of commit dictionaries
+            batch_size: Number of commits per yielded DataFrame
+            
+        Yields:
+            DataFrames with commits and their sentiment scores
+        """
+        batch = []
         for commit in commits:
-            sentiment_data = self.analyze_message(commit['message'])
+            batch.append(commit)
+            if len(batch) >= batch_size:
+                yield self.analyze_commits(batch)
+                batch = []
+        if batch:
+            yield self.analyze_commits(batch)
+    
+    def summarize_commits(self, commits: Iterable[Dict], batch_size: int = 100) -> Dict:
+        """
+        Generate summary statistics from a stream of commits.
+        
+        Args:
+            commits: Iterable of commit dictionaries
+            batch_size: Number of commits analyzed per batch
+            
+        Returns:
+            Dictionary with the same summary statistics as get_summary
+        """
+        summary = RunningSummary()
+        for df in self.iter_results(commits, batch_size):
+            summary.update(df)
+        return summary.result()
+    
+    @staticmethod
+    def merge_results(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge newly analyzed commits into previously stored results.
+        
+        New rows go first so the frame stays in newest-first order, and a
+        commit analyzed in both runs keeps its newest scores.
+        
+        Args:
+            existing: Results stored by a previous run
+            new: Results for commits fetched since that run
             
-            result = {
-                'sha': commit['sha'],
-                'message': commit['message'],
-                'date': pd.to_datetime(commit['date']),
-                'author': commit['author'],
-                'compound': sentiment_data['compound'],
-                'positive': sentiment_data['positive'],
-                'neutral': sentiment_data['neutral'],
-                'negative': sentiment_data['negative'],
-                'sentiment': sentiment_data['sentiment']
-            }
-            results.append(result)
-        
-        df = pd.DataFrame(results)
-        return df
+        Returns:
+            Combined DataFrame without duplicate commits
+        """
+        if existing is None or len(existing) == 0:
+            return new.reset_index(drop=True)
+        if new is None or len(new) == 0:
+            return existing.reset_index(drop=True)
+        merged = pd.concat([new, existing], ignore_index=True)
+        return merged.drop_duplicates(subset='sha', keep='first').reset_index(drop=True)
     
     def get_summary(self, df: pd.DataFrame) -> Dict:
         """
@@ -88,16 +465,43 @@ class SentimentAnalyzer:
         """
         total = len(df)
         
+        # One pass over the labels instead of a boolean filter per class
+        counts = df['sentiment'].value_counts()
+        positive = int(counts.get('positive', 0))
+        neutral = int(counts.get('neutral', 0))
+        negative = int(counts.get('negative', 0))
+        
         summary = {
             'total_commits': total,
-            'positive_count': len(df[df['sentiment'] == 'positive']),
-            'neutral_count': len(df[df['sentiment'] == 'neutral']),
-            'negative_count': len(df[df['sentiment'] == 'negative']),
-            'average_compound': df['compound'].mean(),
-            'positive_percentage': (len(df[df['sentiment'] == 'positive']) / total * 100) if total > 0 else 0,
-            'neutral_percentage': (len(df[df['sentiment'] == 'neutral']) / total * 100) if total > 0 else 0,
-            'negative_percentage': (len(df[df['sentiment'] == 'negative']) / total * 100) if total > 0 else 0,
+            'positive_count': positive,
+            'neutral_count': neutral,
+            'negative_count': negative,
+            'average_compound': float(np.mean(df['compound'].to_numpy())) if total > 0 else math.nan,
+            'positive_percentage': (positive / total * 100) if total > 0 else 0,
+            'neutral_percentage': (neutral / total * 100) if total > 0 else 0,
+            'negative_percentage': (negative / total * 100) if total > 0 else 0,
         }
         
         return summary
 
+
+_shared_analyzer: Optional[SentimentAnalyzer] = None
+_shared_analyzer_lock = threading.Lock()
+
+
+def get_shared_analyzer() -> SentimentAnalyzer:
+    """
+    Return the process-wide analyzer.
+    
+    Scripts that analyze many repositories share its lexicon and score cache
+    instead of setting up an analyzer per repository. Messages are cleaned by
+    the default MessageNormalizer and reduced to their templates before scoring.
+    
+    Returns:
+        Shared SentimentAnalyzer
+    """
+    global _shared_analyzer
+    with _shared_analyzer_lock:
+        if _shared_analyzer is None:
+            _shared_analyzer = SentimentAnalyzer(normalizer=MessageNormalizer(), templates=True)
+        return _shared_analyzer
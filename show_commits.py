@@ -35,8 +35,8 @@ print("-" * 80)
 
 for commit in commits:
     sentiment_data = analyzer.analyze_message(commit['message'])
-    sha = commit['sha']
-    message = commit['message'].split('\n')[0][:60]  # First line, max 60 chars
+    sha = commit['short_sha']
+    message = fetcher.format_commit_message(commit['message'])[:60]  # Subject line, max 60 chars
     sentiment = sentiment_data['sentiment']
     score = sentiment_data['compound']
     
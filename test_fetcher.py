@@ -0,0 +1,420 @@
+"""
+Fetcher Tests
+Runs CommitFetcher against the local fake GitHub server.
+"""
+
+import math
+import os
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+import pandas as pd
+import requests
+
+from commit_analyzer import CommitFetcher, CommitFilters, SeenCommits
+from fake_github import FakeGitHubServer, make_synthetic_commits
+from http_cache import ResponseCache
+from local_git_source import LocalGitCommitSource
+from main import load_results
+from org_crawler import OrgCrawler
+from pipeline import analyze_pipelined
+from rate_limit import RateLimitScheduler
+from resilience import CircuitBreaker, RetryPolicy
+from response_archive import ResponseArchive, ArchiveCommitSource
+from sentiment_analyzer import SentimentAnalyzer
+
+
+def make_fetcher(server: FakeGitHubServer, **kwargs) -> CommitFetcher:
+    """Create a fetcher pointed at the fake server with its own token pool and breaker."""
+    kwargs.setdefault('scheduler', RateLimitScheduler(['test-token']))
+    kwargs.setdefault('retry_policy', RetryPolicy(max_retries=2, base_delay=0.01))
+    kwargs.setdefault('circuit_breaker', CircuitBreaker())
+    return CommitFetcher(server.owner, server.repo, api_url=server.url, **kwargs)
+
+
+def test_concurrent_matches_serial():
+    """Link-header driven concurrent fetching should return the serial result."""
+    with FakeGitHubServer(make_synthetic_commits(1050)) as server:
+        fetcher = make_fetcher(server)
+        serial = fetcher.fetch_commits(limit=1000)
+        concurrent = fetcher.fetch_commits(limit=1000, concurrent=True, max_workers=4)
+    
+    assert len(serial) == 1000
+    assert concurrent == serial
+
+
+def test_etag_cache_serves_unchanged_pages():
+    """A repeated fetch should be answered with 304s and served from the cache."""
+    cache = ResponseCache(tempfile.mkdtemp())
+    with FakeGitHubServer(make_synthetic_commits(250)) as server:
+        first = make_fetcher(server, cache=cache).fetch_commits(limit=None)
+        second = make_fetcher(server, cache=cache).fetch_commits(limit=None)
+        not_modified = server.status_counts.get(304, 0)
+    
+    assert second == first
+    assert not_modified == 3
+    assert cache.hits == 3
+
+
+def test_rate_limit_spreads_requests_over_tokens():
+    """Requests should move to another token when one token's budget is used up."""
+    scheduler = RateLimitScheduler(['token-a', 'token-b'])
+    with FakeGitHubServer(make_synthetic_commits(450), rate_limit=3) as server:
+        commits = make_fetcher(server, scheduler=scheduler).fetch_commits(limit=None)
+    
+    assert len(commits) == 450
+    assert scheduler.remaining == 1
+
+
+def test_transient_errors_are_retried():
+    """A few 5xx answers should be retried without losing commits."""
+    with FakeGitHubServer(make_synthetic_commits(250)) as server:
+        server.fail_next(502, count=2)
+        commits = make_fetcher(server).fetch_commits(limit=None)
+    
+    assert len(commits) == 250
+
+
+def test_persistent_errors_keep_partial_results():
+    """Pages fetched before a persistent failure should be kept."""
+    with FakeGitHubServer(make_synthetic_commits(450)) as server:
+        server.fail_next(503, count=10, page=3)
+        serial = make_fetcher(server).fetch_commits(limit=None)
+        server.fail_next(503, count=10, page=3)
+        concurrent = make_fetcher(server).fetch_commits(limit=None, concurrent=True)
+    
+    assert len(serial) == 200
+    assert concurrent == serial
+
+
+def test_pipeline_keeps_pages_scored_before_an_error():
+    """A fetch error in pipeline mode should keep the pages that were already scored."""
+    analyzer = SentimentAnalyzer()
+    with FakeGitHubServer(make_synthetic_commits(450)) as server:
+        server.fail_next(503, count=10, page=3)
+        commits, df, error = analyze_pipelined(make_fetcher(server).iter_pages(), analyzer)
+        expected = make_fetcher(server).fetch_commits(limit=200)
+    
+    assert isinstance(error, requests.exceptions.RequestException)
+    assert commits == expected
+    assert df.equals(analyzer.analyze_commits(expected))
+
+
+def test_circuit_breaker_stops_requests():
+    """An open circuit should fail fast instead of contacting the host."""
+    breaker = CircuitBreaker(failure_threshold=3)
+    with FakeGitHubServer(make_synthetic_commits(250)) as server:
+        server.fail_next(502, count=3)
+        first = make_fetcher(server, circuit_breaker=breaker).fetch_commits(limit=None)
+        requests_made = server.request_count
+        second = make_fetcher(server, circuit_breaker=breaker).fetch_commits(limit=None)
+    
+    assert first == [] and second == []
+    assert breaker.state == 'open'
+    assert server.request_count == requests_made
+
+
+def test_circuit_breaker_recovers_from_unexpected_errors():
+    """A non-retryable error during the half-open trial should not leave the circuit stuck."""
+    class RedirectLoop(requests.Session):
+        def request(self, *args, **kwargs):
+            raise requests.exceptions.TooManyRedirects("redirect loop")
+    
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] += 30.0
+    with FakeGitHubServer(make_synthetic_commits(50)) as server:
+        failed = make_fetcher(server, circuit_breaker=breaker, session=RedirectLoop()).fetch_commits()
+        reopened = breaker.state
+        now[0] += 30.0
+        recovered = make_fetcher(server, circuit_breaker=breaker).fetch_commits()
+    
+    assert failed == []
+    assert reopened == 'open'
+    assert len(recovered) == 50
+    assert breaker.state == 'closed'
+
+
+def test_results_file_resume_scores_only_new_commits():
+    """A run resumed from stored results should fetch and score only the commits after them."""
+    path = os.path.join(tempfile.mkdtemp(), 'results.csv')
+    newer = make_synthetic_commits(20, seed=3, start=datetime(2024, 2, 1, tzinfo=timezone.utc))
+    analyzer = SentimentAnalyzer()
+    with FakeGitHubServer(make_synthetic_commits(150)) as server:
+        fetcher = make_fetcher(server)
+        analyzer.analyze_commits(fetcher.fetch_commits(limit=None)).to_csv(path, index=False)
+        server.commits[:0] = newer
+        
+        previous = load_results(path)
+        since_sha = previous['sha'].iloc[0]
+        before = server.request_count
+        commits = fetcher.fetch_commits(limit=None, since_sha=since_sha)
+        concurrent = fetcher.fetch_commits(limit=None, concurrent=True, max_workers=4, since_sha=since_sha)
+        requests_made = server.request_count - before
+        by_date = fetcher.fetch_commits(limit=None, since_date=previous['date'].iloc[0].isoformat())
+        full = fetcher.fetch_commits(limit=None)
+    
+    assert [commit['sha'] for commit in commits] == [commit['sha'] for commit in newer]
+    assert concurrent == commits and by_date == commits
+    # The mark is on the first page, so neither run requests a second one
+    assert requests_made == 2
+    
+    new = analyzer.analyze_commits(commits)
+    merged = SentimentAnalyzer.merge_results(previous, new)
+    expected = analyzer.analyze_commits(full)
+    
+    assert len(new) == len(newer)
+    assert merged['sha'].tolist() == expected['sha'].tolist()
+    assert merged['compound'].tolist() == expected['compound'].tolist()
+    assert SentimentAnalyzer.merge_results(merged, new)['sha'].tolist() == merged['sha'].tolist()
+
+
+def assert_same_summary(streamed, batch):
+    """Summaries should agree; the average is only compared up to float summation order."""
+    assert streamed.keys() == batch.keys()
+    for key, value in batch.items():
+        if key == 'average_compound':
+            assert (math.isnan(value) and math.isnan(streamed[key])) or math.isclose(streamed[key], value)
+        else:
+            assert streamed[key] == value, key
+
+
+def test_streaming_matches_batch_analysis():
+    """Streamed pages, commits, results and summaries should match the batch path."""
+    analyzer = SentimentAnalyzer()
+    with FakeGitHubServer(make_synthetic_commits(250)) as server:
+        fetcher = make_fetcher(server)
+        commits = fetcher.fetch_commits(limit=230)
+        pages = list(fetcher.iter_pages(limit=230))
+        streamed = list(fetcher.iter_commits(limit=230))
+        summary = analyzer.summarize_commits(fetcher.iter_commits(limit=230), batch_size=64)
+    
+    assert [len(page) for page in pages] == [100, 100, 30]
+    assert [commit for page in pages for commit in page] == commits
+    assert streamed == commits
+    
+    df = analyzer.analyze_commits(commits)
+    batches = list(analyzer.iter_results(iter(commits), batch_size=64))
+    assert [len(batch) for batch in batches] == [64, 64, 64, 38]
+    assert pd.concat(batches, ignore_index=True).equals(df)
+    assert_same_summary(summary, analyzer.get_summary(df))
+    
+    assert list(analyzer.iter_results(iter([]))) == []
+    assert_same_summary(analyzer.summarize_commits(iter([])), analyzer.get_summary(analyzer.analyze_commits([])))
+
+
+def test_graphql_matches_rest():
+    """GraphQL history should return the same commits as the REST endpoint."""
+    with FakeGitHubServer(make_synthetic_commits(250)) as server:
+        fetcher = make_fetcher(server)
+        rest = fetcher.fetch_commits(limit=230)
+        graphql = fetcher.fetch_commits(limit=230, graphql=True)
+    
+    assert len(rest) == 230
+    assert graphql == rest
+
+
+def test_graphql_matches_rest_after_since_date():
+    """Both APIs should leave out the commit on the since_date boundary of an incremental run."""
+    raw = make_synthetic_commits(250)
+    since_date = raw[120]['commit']['committer']['date']
+    with FakeGitHubServer(raw) as server:
+        fetcher = make_fetcher(server)
+        rest = fetcher.fetch_commits(limit=None, since_date=since_date)
+        graphql = fetcher.fetch_commits(limit=None, since_date=since_date, graphql=True)
+    
+    assert [commit['sha'] for commit in rest] == [commit['sha'] for commit in raw[:120]]
+    assert graphql == rest
+
+
+def test_graphql_stops_at_high_water_mark():
+    """GraphQL pagination should stop at the commit seen by the previous run."""
+    raw = make_synthetic_commits(250)
+    with FakeGitHubServer(raw) as server:
+        commits = make_fetcher(server).fetch_commits(limit=None, graphql=True,
+                                                     since_sha=raw[150]['sha'])
+    
+    assert len(commits) == 150
+    assert commits[-1]['sha'] == raw[149]['sha']
+
+
+def test_sharded_matches_serial():
+    """Date-window sharding should merge to the serial result without duplicates."""
+    raw = make_synthetic_commits(1050)
+    since = raw[-1]['commit']['committer']['date']
+    until = raw[0]['commit']['committer']['date']
+    with FakeGitHubServer(raw) as server:
+        fetcher = make_fetcher(server)
+        serial = fetcher.fetch_commits(limit=None)
+        sharded = fetcher.fetch_commits_sharded(since, until, shards=7, max_workers=4)
+    
+    assert len(serial) == 1050
+    assert sharded == serial
+
+
+def test_sharded_stops_at_limit():
+    """Older date windows should not be paged once the newest ones hold limit commits."""
+    raw = make_synthetic_commits(1050)
+    since = raw[-1]['commit']['committer']['date']
+    until = raw[0]['commit']['committer']['date']
+    with FakeGitHubServer(raw) as server:
+        fetcher = make_fetcher(server)
+        serial = fetcher.fetch_commits(limit=120)
+        before = server.request_count
+        sharded = fetcher.fetch_commits_sharded(since, until, shards=7, max_workers=1, limit=120)
+        requests_made = server.request_count - before
+    
+    assert sharded == serial
+    # The newest window takes two pages; at most one page of the next window is fetched
+    assert requests_made <= 3
+
+
+def test_filters_are_pushed_to_the_server():
+    """Author, path and date filters should be applied by the server, over REST and GraphQL."""
+    raw = make_synthetic_commits(1000)
+    since, until = raw[799]['commit']['committer']['date'], raw[200]['commit']['committer']['date']
+    expected = [c['sha'] for c in raw[200:800]
+                if c['commit']['author']['name'] == 'dev7'
+                and c['files'][0]['filename'].startswith('extensions/git/')]
+    filters = CommitFilters(author='dev7@example.com', path='extensions/git', since=since, until=until)
+    with FakeGitHubServer(raw) as server:
+        rest = make_fetcher(server, filters=filters).fetch_commits(limit=None)
+        rest_requests = server.request_count
+        graphql = make_fetcher(server, filters=filters).fetch_commits(limit=None, graphql=True)
+    
+    assert expected
+    assert [c['sha'] for c in rest] == expected
+    assert graphql == rest
+    assert rest_requests == 1
+
+
+def test_fork_skips_commits_seen_upstream():
+    """A fork fetched after its upstream should only return its own commits."""
+    upstream = make_synthetic_commits(500)
+    fork = make_synthetic_commits(30, seed=1) + upstream
+    seen = SeenCommits()
+    with FakeGitHubServer(upstream) as upstream_server, \
+            FakeGitHubServer(fork, owner='someone') as fork_server:
+        upstream_commits = make_fetcher(upstream_server, seen=seen).fetch_commits(limit=None)
+        fork_commits = make_fetcher(fork_server, seen=seen).fetch_commits(limit=None)
+        fork_requests = fork_server.request_count
+    
+    assert len(upstream_commits) == 500
+    assert [c['sha'] for c in fork_commits] == [c['sha'] for c in fork[:30]]
+    assert fork_requests == 2
+
+
+def test_org_crawl_follows_priority():
+    """An org crawl should skip empty repositories and analyze the rest in priority order."""
+    repositories = {
+        'old-but-large': make_synthetic_commits(300, seed=1, start=datetime(2022, 1, 1, tzinfo=timezone.utc)),
+        'recent': make_synthetic_commits(40, seed=2, start=datetime(2024, 6, 1, tzinfo=timezone.utc)),
+        'empty': [],
+    }
+    scheduler = RateLimitScheduler(['test-token'])
+    with FakeGitHubServer(make_synthetic_commits(120), repositories=repositories) as server:
+        crawler = OrgCrawler(server.owner, scheduler=scheduler, api_url=server.url, max_workers=2)
+        
+        def analyze(owner, repo):
+            fetcher = CommitFetcher(owner, repo, scheduler=scheduler, api_url=server.url)
+            return (repo, len(fetcher.fetch_commits(limit=None)))
+        
+        by_activity = crawler.crawl(analyze)
+        by_size = crawler.crawl(analyze, by='size', max_repos=2)
+    
+    assert by_activity == [('recent', 40), ('demo', 120), ('old-but-large', 300)]
+    assert by_size == [('old-but-large', 300), ('demo', 120)]
+
+
+def test_archive_replay_matches_fetch():
+    """Replaying the archive should return the fetched commits once, even after re-crawls."""
+    archive = ResponseArchive(tempfile.mkdtemp())
+    with FakeGitHubServer(make_synthetic_commits(250)) as server:
+        fetcher = make_fetcher(server, archive=archive)
+        fetched = fetcher.fetch_commits(limit=None)
+        fetcher.fetch_commits(limit=120, graphql=True)
+        requests_made = server.request_count
+    
+    replayed = ArchiveCommitSource(server.owner, server.repo, archive).fetch_commits(limit=None)
+    
+    assert replayed == fetched
+    assert requests_made == server.request_count
+
+
+def test_archive_replay_is_newest_first():
+    """Replay should merge crawls by date, so limit and since_sha see the newest commits first."""
+    archive = ResponseArchive(tempfile.mkdtemp())
+    newer = make_synthetic_commits(5, seed=7, start=datetime(2024, 2, 1, tzinfo=timezone.utc))
+    with FakeGitHubServer(make_synthetic_commits(150)) as server:
+        first = make_fetcher(server, archive=archive).fetch_commits(limit=None)
+        server.commits[:0] = newer
+        second = make_fetcher(server, archive=archive).fetch_commits(limit=None)
+    
+    source = ArchiveCommitSource(server.owner, server.repo, archive)
+    
+    assert source.fetch_commits(limit=5) == second[:5]
+    assert source.fetch_commits(limit=None, since_sha=first[0]['sha']) == second[:5]
+    assert source.fetch_commits(limit=None) == second
+
+
+def make_git_repository(messages):
+    """Create a temporary git repository with one commit per message, oldest first."""
+    path = tempfile.mkdtemp()
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    os.mkdir(os.path.join(path, 'docs'))
+    for i, message in enumerate(messages):
+        date = f"2024-01-0{i + 1}T12:00:00+00:00"
+        env = dict(os.environ, GIT_AUTHOR_NAME=f"dev{i}", GIT_AUTHOR_EMAIL=f"dev{i}@example.com",
+                   GIT_AUTHOR_DATE=date, GIT_COMMITTER_NAME='ci', GIT_COMMITTER_EMAIL='ci@example.com',
+                   GIT_COMMITTER_DATE=date)
+        subprocess.run(['git', '-C', path, 'commit', '-q', '--allow-empty', '-m', message],
+                       check=True, env=env)
+    return path
+
+
+def test_local_git_source_reads_history():
+    """Local clones should be read newest first, stop at since_sha and survive a bad ref."""
+    path = make_git_repository(["Initial commit", "Add parser\n\nHandles nested lists.", "Fix crash"])
+    source = LocalGitCommitSource(path)
+    commits = source.fetch_commits(limit=None)
+    
+    assert [commit['message'] for commit in commits] == [
+        "Fix crash", "Add parser\n\nHandles nested lists.", "Initial commit"]
+    assert [commit['author'] for commit in commits] == ['dev2', 'dev1', 'dev0']
+    assert commits[0]['date'] == '2024-01-03T12:00:00+00:00'
+    assert all(len(commit['sha']) == 40 and commit['short_sha'] == commit['sha'][:7] for commit in commits)
+    
+    assert source.fetch_commits(limit=None, since_sha=commits[2]['sha'][:7]) == commits[:2]
+    assert source.fetch_commits(limit=1) == commits[:1]
+    assert LocalGitCommitSource(path, ref='no-such-branch').fetch_commits() == []
+    
+    assert LocalGitCommitSource.is_git_repository(path)
+    assert LocalGitCommitSource.is_git_repository(os.path.join(path, '.git'))
+    assert not LocalGitCommitSource.is_git_repository(os.path.join(path, 'docs'))
+
+
+if __name__ == '__main__':
+    test_concurrent_matches_serial()
+    test_etag_cache_serves_unchanged_pages()
+    test_rate_limit_spreads_requests_over_tokens()
+    test_transient_errors_are_retried()
+    test_persistent_errors_keep_partial_results()
+    test_pipeline_keeps_pages_scored_before_an_error()
+    test_circuit_breaker_stops_requests()
+    test_circuit_breaker_recovers_from_unexpected_errors()
+    test_results_file_resume_scores_only_new_commits()
+    test_streaming_matches_batch_analysis()
+    test_graphql_matches_rest()
+    test_graphql_matches_rest_after_since_date()
+    test_graphql_stops_at_high_water_mark()
+    test_sharded_matches_serial()
+    test_sharded_stops_at_limit()
+    test_filters_are_pushed_to_the_server()
+    test_fork_skips_commits_seen_upstream()
+    test_org_crawl_follows_priority()
+    test_archive_replay_matches_fetch()
+    test_archive_replay_is_newest_first()
+    test_local_git_source_reads_history()
+    print("All fetcher tests passed")
@@ -0,0 +1,285 @@
+"""
+Scoring Tests
+Checks that the faster scoring paths of SentimentAnalyzer give the same results.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from compiled_lexicon import CompiledLexicon, load_lexicon
+from message_normalizer import MessageNormalizer
+from pipeline import analyze_pipelined, chunked
+from score_store import ScoreStore
+from sentiment_analyzer import PARALLEL_MIN_MESSAGES, ScoreCache, SentimentAnalyzer, get_shared_analyzer
+
+
+MESSAGES = [
+    "Merge branch 'main'",
+    "Update README.md",
+    "Fix crash when opening large files",
+    "Add amazing new feature!!",
+    "This is not good, but the tests are great",
+    "Revert broken change to the parser",
+    "Bump lodash from 4.17.20 to 4.17.21",
+    "Improve startup performance :)",
+]
+
+
+def test_score_cache_matches_uncached():
+    """Cached scores should equal fresh VADER scores, and repeats should hit the cache."""
+    analyzer = SentimentAnalyzer()
+    uncached = SentimentAnalyzer(cache_size=0)
+    stream = MESSAGES * 5 + ["Merge  branch\n'main'"]
+    
+    results = [analyzer.analyze_message(message) for message in stream]
+    
+    assert results == [uncached.analyze_message(message) for message in stream]
+    assert analyzer.cache.misses == len(MESSAGES)
+    assert analyzer.cache.hits == len(stream) - len(MESSAGES)
+
+
+def test_score_cache_evicts_least_recently_used():
+    """A full cache should evict the message that was used longest ago."""
+    analyzer = SentimentAnalyzer(cache_size=2)
+    analyzer.analyze_message(MESSAGES[0])
+    analyzer.analyze_message(MESSAGES[1])
+    analyzer.analyze_message(MESSAGES[0])
+    analyzer.analyze_message(MESSAGES[2])
+    
+    assert analyzer.cache.evictions == 1
+    assert analyzer.cache.get(ScoreCache.make_key(MESSAGES[0])) is not None
+    assert analyzer.cache.get(ScoreCache.make_key(MESSAGES[1])) is None
+
+
+def test_analyze_messages_matches_analyze_message():
+    """The array API should return the per-message scores as typed arrays."""
+    analyzer = SentimentAnalyzer(cache_size=0)
+    scores = analyzer.analyze_messages(MESSAGES)
+    expected = [analyzer.analyze_message(message) for message in MESSAGES]
+    
+    assert scores.compound.dtype == np.float64 and scores.compound.flags['C_CONTIGUOUS']
+    assert scores.sentiment.dtype == np.int8
+    assert scores.compound.tolist() == [e['compound'] for e in expected]
+    assert scores.negative.tolist() == [e['negative'] for e in expected]
+    assert scores.labels().tolist() == [e['sentiment'] for e in expected]
+
+
+def test_parallel_scoring_matches_serial():
+    """Scoring on a process pool should give the serial scores, in order."""
+    messages = [f"{message} (#{i})" for i, message in enumerate(MESSAGES * (PARALLEL_MIN_MESSAGES // 4))]
+    serial = SentimentAnalyzer().analyze_messages(messages)
+    
+    analyzer = SentimentAnalyzer(workers=2)
+    try:
+        parallel = analyzer.analyze_messages(messages + messages[:10])
+    finally:
+        analyzer.close()
+    
+    assert analyzer._pool is None
+    assert parallel.compound[:len(messages)].tolist() == serial.compound.tolist()
+    assert parallel.neutral[:len(messages)].tolist() == serial.neutral.tolist()
+    assert parallel.sentiment[len(messages):].tolist() == serial.sentiment[:10].tolist()
+
+
+def test_vectorized_engine_matches_vader():
+    """The lexicon engine should reproduce VADER's scores, rules and quirks included."""
+    messages = MESSAGES + [
+        "Fix bug that isn't great", "no problems left", "Never so good, never this bad",
+        "very good cleanup", "VERY good cleanup", "GREAT fix for the bug", "fix ugly BAD hack",
+        "good but bad", "good good but bad bad", "nice but nice", "at least good", "least good",
+        "kind of broken", "this is the shit", "Ship it \U0001F600", "works!!!", "why?? why???",
+        "", "   ", "without doubt good", "not so very happy :(",
+    ]
+    reference = SentimentAnalyzer(cache_size=0)
+    analyzer = SentimentAnalyzer(vectorized=True)
+    scores = analyzer.analyze_messages(messages + messages[:5])
+    expected = [reference.analyze_message(message) for message in messages + messages[:5]]
+    
+    for key in ('compound', 'positive', 'neutral', 'negative'):
+        assert np.allclose(getattr(scores, key), [e[key] for e in expected], rtol=0, atol=1e-9), key
+    assert scores.labels().tolist() == [e['sentiment'] for e in expected]
+    # Only the idioms and the emoji are handed to VADER itself
+    assert analyzer.engine.fallbacks == 3
+
+
+def test_vectorized_engine_vocabulary_stays_fixed():
+    """New words should not grow the word arrays, and clearing the token table keeps scores."""
+    engine = SentimentAnalyzer(vectorized=True).engine
+    words = len(engine._words)
+    messages = [f"Fix {i:07x} in src/module_{i}.py, it isn't great" for i in range(500)]
+    
+    first = engine.score(messages)
+    engine._reset_tokens()
+    second = engine.score(messages)
+    
+    assert len(engine._words) == words
+    assert np.array_equal(first, second)
+
+
+def test_compiled_lexicon_matches_vader():
+    """A memory-mapped lexicon should score like VADER, and stale files should be recompiled."""
+    path = os.path.join(tempfile.mkdtemp(), 'vader.lexicon')
+    stale = CompiledLexicon.from_vader()
+    stale.version = '0.0'
+    stale.save(path)
+    
+    lexicon = load_lexicon(path)
+    reloaded = CompiledLexicon.load(path)
+    vader = SentimentIntensityAnalyzer()
+    analyzer = reloaded.make_analyzer()
+    
+    assert lexicon.version != '0.0' and reloaded.version == lexicon.version
+    assert not reloaded.valences.flags.writeable
+    assert analyzer.lexicon == vader.lexicon and analyzer.emojis == vader.emojis
+    assert [analyzer.polarity_scores(m) for m in MESSAGES] == [vader.polarity_scores(m) for m in MESSAGES]
+    assert get_shared_analyzer() is get_shared_analyzer()
+
+
+def test_normalizer_strips_noise_before_scoring():
+    """Trailers, URLs, code and boilerplate should not reach the scorer, and length is capped."""
+    message = (
+        "Fix crash when opening large files\n\n"
+        "See https://example.com/issues/12 and run `make test`.\n"
+        "```\nTraceback: terrible failure\n```\n"
+        "diff --git a/x.py b/x.py\n--- a/x.py\n+++ b/x.py\n@@ -1 +1 @@\n-bad\n+good\n"
+        "This reverts commit 0123456789abcdef0123456789abcdef01234567.\n\n"
+        "Signed-off-by: Dev <dev@example.com>\n"
+        "Co-authored-by: Other <other@example.com>\n"
+    )
+    normalizer = MessageNormalizer()
+    analyzer = SentimentAnalyzer(normalizer=normalizer)
+    
+    assert normalizer.normalize(message) == "Fix crash when opening large files\nSee  and run ."
+    assert MessageNormalizer(subject_only=True).normalize(message) == "Fix crash when opening large files"
+    assert MessageNormalizer(max_length=12).normalize("Improve startup performance") == "Improve"
+    
+    scores = analyzer.analyze_messages([message, "Fix crash when opening large files\nSee https://a.b and run ."])
+    assert analyzer.version.endswith(normalizer.fingerprint)
+    assert analyzer.cache.misses == 1
+    assert scores.compound[0] == scores.compound[1]
+    assert analyzer.analyze_message(message) == analyzer.analyze_message(normalizer.normalize(message))
+    
+    # Messages that are only boilerplate keep their subject line, so they still score as neutral
+    for boilerplate in ("[skip ci]", "https://example.com/release", "Signed-off-by: Dev <dev@example.com>",
+                        "```\nmake test\n```\n"):
+        assert normalizer.normalize(boilerplate) == boilerplate.split('\n')[0]
+        result = analyzer.analyze_message(boilerplate)
+        assert result['positive'] + result['neutral'] + result['negative'] == 1.0
+
+
+def test_templates_are_scored_once():
+    """Messages differing only in numbers, SHAs, versions and names should share one exact score."""
+    messages = [
+        "Merge pull request #12345 from octocat/fix-parser",
+        "Merge pull request #678 from dev7/feature-2",
+        "Bump lodash from 4.17.20 to 4.17.21",
+        "Bump lodash from 3.0.0 to 3.1.2",
+        "Revert 0123abc: great change broke CI",
+        "Revert 9f8e7d6: great change broke CI",
+        "Thanks @alice, nice fix for #7!",
+        "Thanks @bob, nice fix for #8!",
+        "Merge pull request #143 from octocat/fix-parser",  # "143" is a lexicon word
+        "FIX ISSUE 42 NOW",
+    ]
+    reference = SentimentAnalyzer(cache_size=0)
+    analyzer = SentimentAnalyzer(templates=True)
+    
+    scores = [analyzer.analyze_message(message) for message in messages]
+    
+    assert scores == [reference.analyze_message(message) for message in messages]
+    assert analyzer.cache.misses == 6
+    assert analyzer.templates.canonicalize(messages[8]) == "Merge pull request #143 from ref"
+    
+    # Long tokens with many word boundaries must not make the patterns backtrack quadratically
+    for token in ('x-' * 30000, 'a.' * 20000, 'ab/' * 20000):
+        start = time.perf_counter()
+        analyzer.templates.canonicalize(f"Fix {token} parsing")
+        assert time.perf_counter() - start < 1.0
+
+
+def make_commits(messages):
+    """Wrap messages in commit dictionaries with distinct full SHAs."""
+    return [
+        {'sha': f"{i:040x}", 'message': message, 'date': '2024-01-01T00:00:00Z', 'author': 'dev'}
+        for i, message in enumerate(messages)
+    ]
+
+
+def test_score_store_skips_scored_commits():
+    """Stored scores should be reused for the same analyzer version only."""
+    store = ScoreStore(':memory:')
+    commits = make_commits(MESSAGES)
+    first = SentimentAnalyzer(store=store).analyze_commits(commits)
+    
+    rerun = SentimentAnalyzer(store=store)
+    second = rerun.analyze_commits(commits)
+    
+    upgraded = SentimentAnalyzer(store=store)
+    upgraded.version += '-next'
+    upgraded.analyze_commits(commits)
+    
+    assert second.equals(first)
+    assert rerun.cache.misses == 0
+    assert upgraded.cache.misses == len(MESSAGES)
+
+
+def test_pipeline_matches_serial():
+    """Pipelined scoring should return the commits and scores of scoring them in one go."""
+    commits = make_commits(MESSAGES * 5)
+    analyzer = SentimentAnalyzer()
+    
+    fetched, df, error = analyze_pipelined(chunked(iter(commits), size=3), analyzer, queue_size=2)
+    
+    assert fetched == commits and error is None
+    assert df.equals(analyzer.analyze_commits(commits))
+
+
+def test_pipeline_stops_when_scoring_fails():
+    """A scoring error should reach the caller even while the page queue is full."""
+    pages = list(chunked(make_commits(MESSAGES * 5), size=8))
+    exhausted = threading.Event()
+    
+    def source():
+        yield from pages
+        exhausted.set()
+    
+    class FailingAnalyzer(SentimentAnalyzer):
+        def analyze_commits(self, commits):
+            # Fail only once the remaining pages fill the queue and the producer is at its end
+            exhausted.wait(timeout=5)
+            raise RuntimeError("scoring failed")
+    
+    errors = []
+    
+    def run():
+        try:
+            analyze_pipelined(source(), FailingAnalyzer(), queue_size=len(pages) - 1)
+        except RuntimeError as e:
+            errors.append(e)
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    
+    assert not thread.is_alive()
+    assert [str(e) for e in errors] == ["scoring failed"]
+
+
+if __name__ == '__main__':
+    test_score_cache_matches_uncached()
+    test_score_cache_evicts_least_recently_used()
+    test_analyze_messages_matches_analyze_message()
+    test_parallel_scoring_matches_serial()
+    test_vectorized_engine_matches_vader()
+    test_vectorized_engine_vocabulary_stays_fixed()
+    test_compiled_lexicon_matches_vader()
+    test_normalizer_strips_noise_before_scoring()
+    test_templates_are_scored_once()
+    test_score_store_skips_scored_commits()
+    test_pipeline_matches_serial()
+    test_pipeline_stops_when_scoring_fails()
@@ -3,6 +3,7 @@ Validation Module
 Validates data integrity and analysis results.
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple
 import sys
@@ -52,23 +53,15 @@ class ResultValidator:
             errors.append(f"ERROR: Found {len(invalid_sum)} commits where pos+neu+neg ≠ 1.0")
         
         # Validate sentiment classification matches compound score
-        misclassified = []
-        for _, row in df.iterrows():
-            compound = row['compound']
-            sentiment = row['sentiment']
-            
-            if compound >= 0.05 and sentiment != 'positive':
-                misclassified.append((row['sha'], compound, sentiment))
-            elif compound <= -0.05 and sentiment != 'negative':
-                misclassified.append((row['sha'], compound, sentiment))
-            elif -0.05 < compound < 0.05 and sentiment != 'neutral':
-                misclassified.append((row['sha'], compound, sentiment))
-        
-        if misclassified:
+        compound = df['compound'].to_numpy()
+        expected = np.select([compound >= 0.05, compound <= -0.05], ['positive', 'negative'], 'neutral')
+        misclassified = df[df['sentiment'].to_numpy() != expected]
+        
+        if len(misclassified) > 0:
             errors.append(f"ERROR: Found {len(misclassified)} misclassified commits")
             # Show first 3 examples
-            for sha, comp, sent in misclassified[:3]:
-                errors.append(f"  - SHA {sha}: compound={comp:.3f}, classified as '{sent}'")
+            for _, row in misclassified.head(3).iterrows():
+                errors.append(f"  - SHA {row['sha']}: compound={row['compound']:.3f}, classified as '{row['sentiment']}'")
         
         return len(errors) == 0, errors
     
@@ -111,9 +104,10 @@ class ResultValidator:
             errors.append(f"ERROR: Average compound score mismatch ({summary['average_compound']:.6f} vs {actual_avg:.6f})")
         
         # Verify counts match DataFrame
-        actual_pos = len(df[df['sentiment'] == 'positive'])
-        actual_neu = len(df[df['sentiment'] == 'neutral'])
-        actual_neg = len(df[df['sentiment'] == 'negative'])
+        labels = df['sentiment'].to_numpy()
+        actual_pos = int(np.count_nonzero(labels == 'positive'))
+        actual_neu = int(np.count_nonzero(labels == 'neutral'))
+        actual_neg = int(np.count_nonzero(labels == 'negative'))
         
         if summary['positive_count'] != actual_pos:
             errors.append(f"ERROR: Positive count mismatch ({summary['positive_count']} vs {actual_pos})")
@@ -165,8 +159,8 @@ class ResultValidator:
         except:
             errors.append("ERROR: Invalid date format in 'date' column")
         
-        # Verify SHA format (should be 7 characters)
-        invalid_shas = df[df['sha'].str.len() != 7]
+        # Verify SHA format (full SHA, or an abbreviated one from older results)
+        invalid_shas = df[~df['sha'].str.len().between(7, 64)]
         if len(invalid_shas) > 0:
             warnings.append(f"WARNING: Found {len(invalid_shas)} commits with non-standard SHA format")
         